@@ -1,21 +1,120 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import socket
+import uuid
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import psycopg
+from psycopg import AsyncConnection, AsyncCursor
 from psycopg.rows import dict_row
 from psycopg.types.json import Json
+from psycopg_pool import AsyncConnectionPool
 
 DATABASE_URL = os.environ["DATABASE_URL"]
 
+logger = logging.getLogger("agentic_sre.db")
 
-def get_conn() -> psycopg.Connection:
-    return psycopg.connect(DATABASE_URL, row_factory=dict_row)
+_pool: Optional[AsyncConnectionPool] = None
 
+# Bumped after every committed write from this process; read-side caches include it in
+# their keys so local writes are visible immediately. Other processes' writes only show
+# up once those caches expire, so their TTLs must stay short.
+_write_version = 0
 
-def upsert_incident(
+
+def write_version() -> int:
+    return _write_version
+
+
+def _bump_write_version() -> None:
+    global _write_version
+    _write_version += 1
+
+
+def _prepare_threshold() -> Optional[int]:
+    # psycopg prepares a statement server-side once it has run this many times on a
+    # connection; 0 prepares on first use since the set of queries here is fixed.
+    # Set DB_PREPARE_THRESHOLD to empty to disable (e.g. PgBouncer in transaction mode).
+    v = os.getenv("DB_PREPARE_THRESHOLD", "0")
+    return int(v) if v.strip() else None
+
+
+async def open_pool() -> None:
+    """Open the shared async connection pool. Called once from app startup."""
+    global _pool
+    if _pool is None:
+        _pool = AsyncConnectionPool(
+            DATABASE_URL,
+            min_size=int(os.getenv("DB_POOL_MIN_SIZE", "4")),
+            max_size=int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+            kwargs={"row_factory": dict_row, "prepare_threshold": _prepare_threshold()},
+            open=False,
+        )
+        await _pool.open()
+        await _ensure_runtime_schema()
+
+
+# Tables added after the initial schema. postgres/schema.sql (the initdb ConfigMap) only
+# runs on an empty data dir, so existing databases get these at startup instead.
+_RUNTIME_SCHEMA = """
+create table if not exists incident_locks (
+  fingerprint text primary key,
+  owner text not null,
+  expires_at timestamptz not null
+)
+"""
+# Serializes the DDL across worker processes starting at the same time: concurrent
+# "create table if not exists" can still collide on the catalog's unique indexes.
+_SCHEMA_LOCK_KEY = 0x5EC0DE
+
+
+async def _ensure_runtime_schema() -> None:
+    async with get_conn() as conn, conn.transaction():
+        await conn.execute("select pg_advisory_xact_lock(%s)", (_SCHEMA_LOCK_KEY,))
+        await conn.execute(_RUNTIME_SCHEMA)
+
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_conn():
+    """Borrow a pooled connection; commits on clean exit, rolls back on error."""
+    if _pool is None:
+        raise RuntimeError("db_pool_not_open")
+    return _pool.connection()
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[AsyncConnection]:
+    """
+    Borrow a connection and run the block in a single transaction (one commit).
+    Pass the yielded connection to helpers as `conn=` to include them in it.
+    """
+    async with get_conn() as conn, conn.transaction():
+        yield conn
+    _bump_write_version()
+
+
+@asynccontextmanager
+async def _cursor(conn: Optional[AsyncConnection]) -> AsyncIterator[AsyncCursor]:
+    """Cursor on the caller's connection (inside its transaction), or on a freshly borrowed one."""
+    if conn is not None:
+        async with conn.cursor() as cur:
+            yield cur
+    else:
+        async with get_conn() as owned, owned.cursor() as cur:
+            yield cur
+
+
+async def upsert_incident(
     *,
     fingerprint: str,
     alertname: Optional[str],
@@ -24,6 +123,7 @@ def upsert_incident(
     severity: Optional[str],
     agent_mode: str,
     summary: Optional[str] = None,
+    conn: Optional[AsyncConnection] = None,
 ) -> Dict[str, Any]:
     """
     Upsert incident record (MVP).
@@ -40,8 +140,8 @@ def upsert_incident(
             parts.append(f"Pod: {pod}")
         summary = " | ".join(parts)
 
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
+    async with _cursor(conn) as cur:
+        await cur.execute(
             """
             insert into incidents (fingerprint, alertname, namespace, pod, severity, agent_mode, summary)
             values (%s, %s, %s, %s, %s, %s, %s)
@@ -57,66 +157,185 @@ def upsert_incident(
             """,
             (fingerprint, alertname, namespace, pod, severity, agent_mode, summary),
         )
-        row = cur.fetchone()
+        row = await cur.fetchone()
         assert row is not None
-        return row
+    if conn is None:
+        _bump_write_version()
+    return row
 
 
-def update_incident_runbook(incident_id: int, runbook_id: Optional[str]) -> None:
+async def update_incident_runbook(
+    incident_id: int, runbook_id: Optional[str], *, conn: Optional[AsyncConnection] = None
+) -> None:
     """Update the runbook_id field for an existing incident."""
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
+    async with _cursor(conn) as cur:
+        await cur.execute(
             "update incidents set runbook_id = %s, updated_at = now() where id = %s",
             (runbook_id, incident_id),
         )
+    if conn is None:
+        _bump_write_version()
 
 
-def add_event(incident_id: int, event_type: str, payload: Dict[str, Any]) -> None:
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
+async def add_event(
+    incident_id: int, event_type: str, payload: Dict[str, Any], *, conn: Optional[AsyncConnection] = None
+) -> None:
+    async with _cursor(conn) as cur:
+        await cur.execute(
             "insert into incident_events (incident_id, event_type, payload) values (%s, %s, %s)",
             (incident_id, event_type, Json(payload)),
         )
+    if conn is None:
+        _bump_write_version()
 
 
-def list_incidents(*, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
+async def add_events(events: List[Dict[str, Any]], *, conn: Optional[AsyncConnection] = None) -> None:
+    """
+    Insert several events in one batch (psycopg pipelines executemany into a single round-trip).
+    Each item carries `incident_id`, `event_type` and `payload`.
+    """
+    if not events:
+        return
+    async with _cursor(conn) as cur:
+        await cur.executemany(
+            "insert into incident_events (incident_id, event_type, payload) values (%s, %s, %s)",
+            [(int(e["incident_id"]), e["event_type"], Json(e["payload"])) for e in events],
+        )
+    if conn is None:
+        _bump_write_version()
+
+
+async def list_incidents_with_latest_webhook(
+    *, limit: int = 50, offset: int = 0, conn: Optional[AsyncConnection] = None
+) -> List[Dict[str, Any]]:
+    """
+    List incidents, most recently updated first, each with `node` taken from the labels
+    of its latest 'webhook_received' event. One query instead of one lookup per incident.
+    """
+    async with _cursor(conn) as cur:
+        await cur.execute(
             """
-            select *
-            from incidents
-            order by updated_at desc
+            select i.*, we.payload->'labels'->>'node' as node
+            from incidents i
+            left join lateral (
+                select payload
+                from incident_events
+                where incident_id = i.id and event_type = 'webhook_received'
+                order by ts desc
+                limit 1
+            ) we on true
+            order by i.updated_at desc
             limit %s offset %s
             """,
             (int(limit), int(offset)),
         )
-        return list(cur.fetchall() or [])
+        return list(await cur.fetchall() or [])
+
 
+# Serializes the startup scan for unfinished alerts across worker processes and replicas.
+_UNFINISHED_SCAN_LOCK_KEY = 0x5EC0DF
 
-def get_incident(*, incident_id: int) -> Optional[Dict[str, Any]]:
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("select * from incidents where id = %s", (int(incident_id),))
-        return cur.fetchone()
 
+async def mark_unfinished_incidents(
+    *, since_seconds: int, min_age_seconds: int, limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Find incidents updated in the last `since_seconds` whose latest 'webhook_received' event
+    (at least `min_age_seconds` old) has no 'final', 'suppressed' or 'unfinished' event at or
+    after it and whose fingerprint holds no live lease in incident_locks, i.e. alerts accepted
+    at intake that no live process is working on. Each gets an 'unfinished' event, so it is
+    reported once rather than by every process that starts; the rows are returned.
 
-def list_incident_events(*, incident_id: int, limit: int = 200) -> List[Dict[str, Any]]:
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
+    Runs under a transaction-level advisory lock; returns [] if another process is scanning.
+    """
+    async with transaction() as conn:
+        cur = await conn.execute("select pg_try_advisory_xact_lock(%s) as locked", (_UNFINISHED_SCAN_LOCK_KEY,))
+        if not (await cur.fetchone())["locked"]:
+            return []
+        cur = await conn.execute(
             """
-            select *
+            select i.id, i.fingerprint, we.ts as webhook_ts
+            from incidents i
+            join lateral (
+                select ts
+                from incident_events
+                where incident_id = i.id and event_type = 'webhook_received'
+                order by ts desc
+                limit 1
+            ) we on true
+            where i.updated_at > now() - make_interval(secs => %s)
+              and we.ts < now() - make_interval(secs => %s)
+              and not exists (
+                select 1
+                from incident_events e
+                where e.incident_id = i.id
+                  and e.event_type in ('final', 'suppressed', 'unfinished')
+                  and e.ts >= we.ts
+              )
+              and not exists (
+                select 1
+                from incident_locks l
+                where l.fingerprint = i.fingerprint and l.expires_at > now()
+              )
+            order by we.ts desc
+            limit %s
+            """,
+            (int(since_seconds), int(min_age_seconds), int(limit)),
+        )
+        rows = list(await cur.fetchall() or [])
+        await add_events(
+            [
+                {
+                    "incident_id": int(r["id"]),
+                    "event_type": "unfinished",
+                    "payload": {"reason": "no_outcome_at_startup", "fingerprint": r["fingerprint"]},
+                }
+                for r in rows
+            ],
+            conn=conn,
+        )
+    return rows
+
+
+async def get_incident(*, incident_id: int, conn: Optional[AsyncConnection] = None) -> Optional[Dict[str, Any]]:
+    async with _cursor(conn) as cur:
+        await cur.execute("select * from incidents where id = %s", (int(incident_id),))
+        return await cur.fetchone()
+
+
+async def iter_incident_events(
+    *,
+    incident_id: int,
+    after_id: int = 0,
+    limit: int = 100,
+    include_payload: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield events for an incident oldest-first, starting after event id `after_id` (keyset
+    pagination on the (incident_id, id) index). Rows come from a server-side cursor, so they
+    are streamed rather than fetched at once. `include_payload=False` skips the JSONB column.
+    """
+    columns = "*" if include_payload else "id, incident_id, ts, event_type"
+    async with get_conn() as conn, conn.cursor(name="incident_events_stream") as cur:
+        await cur.execute(
+            f"""
+            select {columns}
             from incident_events
-            where incident_id = %s
-            order by ts desc
+            where incident_id = %s and id > %s
+            order by id asc
             limit %s
             """,
-            (int(incident_id), int(limit)),
+            (int(incident_id), int(after_id), int(limit)),
         )
-        return list(cur.fetchall() or [])
+        async for row in cur:
+            yield row
 
 
-def get_latest_event_by_type(*, incident_id: int, event_type: str) -> Optional[Dict[str, Any]]:
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
+async def get_latest_event_by_type(
+    *, incident_id: int, event_type: str, conn: Optional[AsyncConnection] = None
+) -> Optional[Dict[str, Any]]:
+    async with _cursor(conn) as cur:
+        await cur.execute(
             """
             select *
             from incident_events
@@ -126,10 +345,10 @@ def get_latest_event_by_type(*, incident_id: int, event_type: str) -> Optional[D
             """,
             (int(incident_id), str(event_type)),
         )
-        return cur.fetchone()
+        return await cur.fetchone()
 
 
-def get_similar_past_incidents(
+async def get_similar_past_incidents(
     *,
     current_incident_id: int,
     alertname: Optional[str],
@@ -137,6 +356,7 @@ def get_similar_past_incidents(
     pod: Optional[str],
     node: Optional[str],
     limit: int = 50,
+    conn: Optional[AsyncConnection] = None,
 ) -> List[Dict[str, Any]]:
     """
     Return all past incidents similar to the current one, across all time.
@@ -203,9 +423,9 @@ def get_similar_past_incidents(
         LIMIT {int(limit)}
     """
 
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(sql, params)
-        return list(cur.fetchall() or [])
+    async with _cursor(conn) as cur:
+        await cur.execute(sql, params)
+        return list(await cur.fetchall() or [])
 
 
 def advisory_lock_key(s: str) -> int:
@@ -214,16 +434,87 @@ def advisory_lock_key(s: str) -> int:
     return key_u64 % (2**63)
 
 
-def try_advisory_lock(fingerprint: str) -> bool:
-    key = advisory_lock_key(fingerprint)
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("select pg_try_advisory_lock(%s) as locked", (key,))
-        row = cur.fetchone()
-        return bool(row and row["locked"])
-
-
-def advisory_unlock(fingerprint: str) -> None:
+@asynccontextmanager
+async def advisory_lock(fingerprint: str) -> AsyncIterator[bool]:
+    """
+    Try to take the session-level advisory lock for `fingerprint` and hold it for the block.
+    The lock belongs to the connection, so the same pooled connection stays checked out
+    until the lock is released on exit. Yields whether the lock was acquired.
+    """
     key = advisory_lock_key(fingerprint)
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("select pg_advisory_unlock(%s)", (key,))
-
+    async with get_conn() as conn:
+        cur = await conn.execute("select pg_try_advisory_lock(%s) as locked", (key,))
+        row = await cur.fetchone()
+        # End the implicit transaction so the connection is not idle-in-transaction while held.
+        await conn.commit()
+        locked = bool(row and row["locked"])
+        try:
+            yield locked
+        finally:
+            if locked:
+                await conn.execute("select pg_advisory_unlock(%s)", (key,))
+
+
+async def _renew_lease(fingerprint: str, owner: str, ttl_seconds: int) -> None:
+    """Heartbeat for lease_lock: push expires_at forward until cancelled or the lease is lost."""
+    interval = max(1.0, ttl_seconds / 3)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with get_conn() as conn:
+                cur = await conn.execute(
+                    """
+                    update incident_locks set expires_at = now() + make_interval(secs => %s)
+                    where fingerprint = %s and owner = %s
+                    """,
+                    (ttl_seconds, fingerprint, owner),
+                )
+                renewed = cur.rowcount > 0
+        except Exception as e:
+            # Transient DB error: retry on the next beat; the lease still has up to 2/3 of its TTL.
+            logger.warning("lease_renew_failed fingerprint=%s error=%s", fingerprint, e)
+            continue
+        if not renewed:
+            logger.warning("lease_lost fingerprint=%s owner=%s", fingerprint, owner)
+            return
+
+
+@asynccontextmanager
+async def lease_lock(fingerprint: str, ttl_seconds: int) -> AsyncIterator[bool]:
+    """
+    Take a dedupe lease on `fingerprint` in the incident_locks table for the block.
+    Unlike advisory_lock, no connection is held in between: acquire, each renewal and
+    release are one statement each. While the block runs the lease is renewed every
+    ttl/3 seconds, so it only lapses if this process stops (crash, hang, lost DB); a lease
+    left behind that way is taken over once it expires.
+    Yields whether the lease was acquired.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+    async with get_conn() as conn, conn.cursor() as cur:
+        await cur.execute(
+            """
+            insert into incident_locks (fingerprint, owner, expires_at)
+            values (%s, %s, now() + make_interval(secs => %s))
+            on conflict (fingerprint) do update
+              set owner = excluded.owner, expires_at = excluded.expires_at
+              where incident_locks.expires_at < now()
+            returning owner
+            """,
+            (fingerprint, owner, ttl_seconds),
+        )
+        locked = await cur.fetchone() is not None
+    renew = asyncio.create_task(_renew_lease(fingerprint, owner, ttl_seconds)) if locked else None
+    try:
+        yield locked
+    finally:
+        if renew is not None:
+            renew.cancel()
+            with suppress(asyncio.CancelledError):
+                await renew
+        if locked:
+            async with get_conn() as conn:
+                # Compare-and-delete: never drop a lease another process took over after expiry.
+                await conn.execute(
+                    "delete from incident_locks where fingerprint = %s and owner = %s",
+                    (fingerprint, owner),
+                )
@@ -0,0 +1,32 @@
+"""Gunicorn settings for serving agent.service:app with uvicorn workers."""
+from __future__ import annotations
+
+import multiprocessing
+import os
+
+from uvicorn_worker import UvicornWorker
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+# Fallback when WEB_CONCURRENCY is unset: 2 x usable CPUs, capped. In a container
+# cpu_count() reports the host's CPUs, and every worker opens its own DB pool
+# (up to DB_POOL_MAX_SIZE connections), so an uncapped default can exhaust max_connections.
+_MAX_DEFAULT_WORKERS = 4
+_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else multiprocessing.cpu_count()
+workers = int(os.getenv("WEB_CONCURRENCY", "0") or 0) or min(_cpus * 2, _MAX_DEFAULT_WORKERS)
+keepalive = int(os.getenv("KEEPALIVE_SECONDS", "30"))
+
+# Workers inherit this: the app needs it to know in-process dedupe is not enough.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+
+class AgentUvicornWorker(UvicornWorker):
+    # Past limit_concurrency, uvicorn answers 503 instead of queueing unbounded work.
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "limit_concurrency": int(os.getenv("LIMIT_CONCURRENCY", "1000")),
+        "access_log": False,
+    }
+
+
+worker_class = AgentUvicornWorker
@@ -4,11 +4,15 @@ import json
 import os
 import time
 import logging
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 logger = logging.getLogger("agentic_sre.llm")
 
 
+# The sync client is used from graph worker threads; httpx.Client is thread-safe, so one
+# instance (and its keep-alive pool) is shared instead of a new TLS handshake per decision.
+@lru_cache(maxsize=1)
 def _openai_client():
     try:
         from openai import OpenAI
@@ -21,6 +25,36 @@ def _openai_client():
     return OpenAI(api_key=api_key)
 
 
+def _openai_async_client(http_client: Any = None):
+    try:
+        from openai import AsyncOpenAI
+    except Exception as e:
+        raise RuntimeError(f"openai_import_failed: {e}") from e
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY_not_set")
+    return AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+
+def create_async_client():
+    """
+    Build a long-lived AsyncOpenAI client over a pooled HTTP/2 httpx.AsyncClient, meant to
+    be created once at app startup and shared by all requests. The caller must close() it.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("OPENAI_API_KEY_not_set")
+
+    import httpx
+
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120")), connect=3.0),
+    )
+    return _openai_async_client(http_client)
+
+
 def _json_load_loose(text: str) -> Dict[str, Any]:
     """
     Parse a JSON object from a model response.
@@ -206,7 +240,8 @@ def decide_workflow_tool_call(
     return out
 
 
-def generate_incident_analysis(
+async def generate_incident_analysis(
+    client: Any = None,
     *,
     runbook_id: str,
     cluster: str,
@@ -223,6 +258,9 @@ def generate_incident_analysis(
     When past_incidents is provided, the analysis includes a history-aware
     section that flags repeat patterns and gives the SRE team better
     long-term remediation recommendations.
+
+    `client` is a shared client from create_async_client(); without one, a
+    short-lived client is created for this call.
     """
     model = model or os.getenv("OPENAI_MODEL", "gpt-5.2")
 
@@ -264,15 +302,15 @@ def generate_incident_analysis(
     if has_history:
         user["past_incidents"] = past_incidents
 
-    client = _openai_client()
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=0,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": json.dumps(user)},
-        ],
-    )
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": json.dumps(user)},
+    ]
+    if client is not None:
+        resp = await client.chat.completions.create(model=model, temperature=0, messages=messages)
+    else:
+        async with _openai_async_client() as owned:
+            resp = await owned.chat.completions.create(model=model, temperature=0, messages=messages)
     return (resp.choices[0].message.content or "").strip()
 
 
@@ -32,6 +32,21 @@ create table if not exists incident_events (
 create index if not exists incident_events_incident_id_ts_idx
   on incident_events (incident_id, ts desc);
 
+-- Latest event of a given type per incident (incident list node lookup, analysis/final lookups).
+create index if not exists incident_events_incident_id_type_ts_idx
+  on incident_events (incident_id, event_type, ts desc);
+
+-- Keyset pagination of an incident's timeline (id > after_id order by id).
+create index if not exists incident_events_incident_id_id_idx
+  on incident_events (incident_id, id);
+
+-- Short-lived dedupe leases, one row per fingerprint being processed (see db.lease_lock).
+create table if not exists incident_locks (
+  fingerprint text primary key,
+  owner text not null,
+  expires_at timestamptz not null
+);
+
 -- Vector similarity index for semantic search (IVFFlat for fast approximate search)
 create index if not exists incidents_summary_embedding_idx
   on incidents using ivfflat (summary_embedding vector_cosine_ops)
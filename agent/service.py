@@ -1,36 +1,155 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import asynccontextmanager, nullcontext
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import msgspec
+import orjson
+from cachetools import TTLCache
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from markdown_it import MarkdownIt
 
 from agent.db import (
     add_event,
-    advisory_unlock,
+    add_events,
+    advisory_lock,
+    close_pool,
+    get_conn,
     get_incident,
     get_latest_event_by_type,
     get_similar_past_incidents,
-    list_incident_events,
-    list_incidents,
-    try_advisory_lock,
+    iter_incident_events,
+    lease_lock,
+    list_incidents_with_latest_webhook,
+    mark_unfinished_incidents,
+    open_pool,
+    transaction,
     update_incident_runbook,
     upsert_incident,
+    write_version,
 )
 
-from agent.main import build_graph
-from agent.llm import generate_incident_analysis
+from agent.llm import create_async_client, generate_incident_analysis
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    await open_pool()
+    # One LLM client per process, so analysis calls reuse pooled HTTP/2 connections.
+    try:
+        _app.state.llm = create_async_client()
+    except Exception as e:
+        logger.warning("llm_client_unavailable error=%s", e)
+        _app.state.llm = None
+    await _report_unfinished_alerts()
+    try:
+        yield
+    finally:
+        # Let queued alerts finish before the pool goes away (bounded by the worker's graceful timeout).
+        if _background_tasks:
+            await asyncio.wait(_background_tasks, timeout=float(os.getenv("SHUTDOWN_GRACE_SECONDS", "25")))
+        if _app.state.llm is not None:
+            await _app.state.llm.close()
+        await close_pool()
+
+
+def _json_default(obj: Any) -> Any:
+    # orjson covers datetime/UUID natively; numeric columns (Decimal) are the remaining gap.
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"not JSON serializable: {type(obj).__name__}")
+
+
+_ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(obj: Any, option: int = 0) -> bytes:
+    return orjson.dumps(obj, default=_json_default, option=_ORJSON_OPTS | option)
+
+
+class _JSONResponse(Response):
+    """Serialize with orjson directly; no jsonable_encoder pass."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+
+_access_logger = logging.getLogger("agentic_sre.access")
+# Probes hit these constantly; logging them only adds noise.
+_ACCESS_LOG_SKIP = frozenset({"/healthz"})
 
-app = FastAPI(title="agentic-sre-agent", version="0.1.0")
-graph = build_graph()
+
+class _AccessLogMiddleware:
+    """
+    Minimal ASGI access log (method, path, status, duration) in place of uvicorn's,
+    which is disabled in gunicorn.conf.py. Costs nothing when INFO is off for the logger.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"] in _ACCESS_LOG_SKIP
+            or not _access_logger.isEnabledFor(logging.INFO)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _access_logger.info(
+                "http_request method=%s path=%s status=%d duration_ms=%.1f",
+                scope["method"],
+                scope["path"],
+                status,
+                (time.perf_counter() - start) * 1000,
+            )
+
+
+app = FastAPI(
+    title="agentic-sre-agent",
+    version="0.1.0",
+    lifespan=_lifespan,
+    default_response_class=_JSONResponse,
+)
+# Incident detail/list JSON is highly repetitive; small bodies are not worth the CPU.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_LEVEL", "5")),
+)
+# Added last so it is outermost and times the whole request, compression included.
+app.add_middleware(_AccessLogMiddleware)
 
 AGENT_MODE = os.getenv("AGENT_MODE", "recommend")
 CLUSTER_NAME = os.getenv("CLUSTER_NAME", "unknown")
+REPLICAS = int(os.getenv("REPLICAS", "1") or 1)
+# Set by gunicorn.conf.py; each worker is a separate process with its own in-flight set.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1") or 1)
 
 logger = logging.getLogger("agentic_sre.webhook")
 if not logger.handlers:
@@ -38,38 +157,72 @@ if not logger.handlers:
     logging.basicConfig(level=getattr(logging, level, logging.INFO), format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
 
-class Alert(BaseModel):
+@lru_cache(maxsize=1)
+def _get_graph():
+    """Build the LangGraph on first use so worker boot does not pay for it."""
+    from agent.main import build_graph
+
+    return build_graph()
+
+
+# Analysis markdown is rendered once when the event is written, not on every page view.
+# Raw HTML stays disabled: the markdown comes from an LLM and is escaped, not trusted.
+_MD = MarkdownIt("commonmark", {"html": False}).enable("table")
+
+
+def _render_markdown(md: str) -> str:
+    return _MD.render(md) if md else ""
+
+
+# Webhook payloads are decoded straight from the request body with msgspec, which
+# validates in C and skips pydantic's per-model overhead on large alert batches.
+class Alert(msgspec.Struct, frozen=True):
     status: str
-    labels: Dict[str, str] = Field(default_factory=dict)
-    annotations: Dict[str, str] = Field(default_factory=dict)
+    labels: Dict[str, str] = msgspec.field(default_factory=dict)
+    annotations: Dict[str, str] = msgspec.field(default_factory=dict)
     startsAt: Optional[str] = None
     endsAt: Optional[str] = None
     generatorURL: Optional[str] = None
     fingerprint: Optional[str] = None
 
 
-class AlertmanagerWebhook(BaseModel):
+class AlertmanagerWebhook(msgspec.Struct, frozen=True, kw_only=True):
     receiver: Optional[str] = None
     status: str
-    alerts: List[Alert] = Field(default_factory=list)
-    groupLabels: Dict[str, str] = Field(default_factory=dict)
-    commonLabels: Dict[str, str] = Field(default_factory=dict)
-    commonAnnotations: Dict[str, str] = Field(default_factory=dict)
+    alerts: List[Alert] = msgspec.field(default_factory=list)
+    groupLabels: Dict[str, str] = msgspec.field(default_factory=dict)
+    commonLabels: Dict[str, str] = msgspec.field(default_factory=dict)
+    commonAnnotations: Dict[str, str] = msgspec.field(default_factory=dict)
     externalURL: Optional[str] = None
     version: Optional[str] = None
     groupKey: Optional[str] = None
     truncatedAlerts: Optional[int] = None
 
 
-@app.get("/healthz")
-def healthz() -> Dict[str, str]:
+_webhook_decoder = msgspec.json.Decoder(AlertmanagerWebhook)
+
+
+@app.get("/healthz", response_model=None)
+async def healthz() -> Dict[str, str]:
     return {"ok": "true"}
 
 
-@app.get("/", response_class=HTMLResponse)
-def ui_index() -> str:
-    # Simple no-auth UI (MVP)
-    return """
+# The UI pages are static: encode them once at import and let browsers revalidate by ETag.
+_UI_CACHE_CONTROL = "public, max-age=60"
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _static_html(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"Cache-Control": _UI_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/html; charset=utf-8", headers=headers)
+
+
+_INDEX_HTML = """
 <!doctype html>
 <html>
   <head>
@@ -130,62 +283,60 @@ def ui_index() -> str:
     </script>
   </body>
 </html>
-""".strip()
-
+""".strip().encode("utf-8")
+_INDEX_ETAG = _etag(_INDEX_HTML)
 
-@app.get("/incident/{incident_id}", response_class=HTMLResponse)
-def ui_incident(incident_id: int) -> str:
-    return f"""
+_INCIDENT_HTML = """
 <!doctype html>
 <html>
   <head>
     <meta charset="utf-8"/>
     <meta name="viewport" content="width=device-width,initial-scale=1"/>
-    <title>Incident {incident_id}</title>
+    <title>Incident</title>
     <style>
-      body{{font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial; margin:24px; color:#111827;}}
-      a{{color:#2563eb; text-decoration:none}}
-      a:hover{{text-decoration:underline}}
-      pre{{background:#0b1020; color:#e5e7eb; padding:12px; border-radius:8px; overflow:auto; font-size:13px;}}
-      code{{background:#f3f4f6; padding:1px 5px; border-radius:4px; font-size:13px;}}
-      pre code{{background:none; padding:0;}}
-      .card{{border:1px solid #e5e7eb; border-radius:12px; padding:20px; margin:16px 0;}}
-      .card-header{{display:flex; align-items:center; justify-content:space-between; margin-bottom:12px;}}
-      .card-header h3{{margin:0; font-size:16px; color:#374151;}}
-      .muted{{color:#6b7280}}
-      .pill{{display:inline-block; padding:2px 8px; border-radius:999px; font-size:12px; font-weight:500;}}
-      .pill-blue{{background:#dbeafe; color:#1d4ed8;}}
-      .pill-gray{{background:#f3f4f6; color:#374151;}}
-      .pill-red{{background:#fee2e2; color:#b91c1c;}}
-      .pill-green{{background:#dcfce7; color:#15803d;}}
-      .btn{{display:inline-flex; align-items:center; gap:6px; padding:5px 12px; border-radius:6px; font-size:13px; font-weight:500; cursor:pointer; border:1px solid #d1d5db; background:#fff; color:#374151; transition:background 0.15s;}}
-      .btn:hover{{background:#f9fafb;}}
-      .btn:disabled{{opacity:0.5; cursor:not-allowed;}}
-      .btn-primary{{background:#2563eb; color:#fff; border-color:#2563eb;}}
-      .btn-primary:hover{{background:#1d4ed8;}}
+      body{font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial; margin:24px; color:#111827;}
+      a{color:#2563eb; text-decoration:none}
+      a:hover{text-decoration:underline}
+      pre{background:#0b1020; color:#e5e7eb; padding:12px; border-radius:8px; overflow:auto; font-size:13px;}
+      code{background:#f3f4f6; padding:1px 5px; border-radius:4px; font-size:13px;}
+      pre code{background:none; padding:0;}
+      .card{border:1px solid #e5e7eb; border-radius:12px; padding:20px; margin:16px 0;}
+      .card-header{display:flex; align-items:center; justify-content:space-between; margin-bottom:12px;}
+      .card-header h3{margin:0; font-size:16px; color:#374151;}
+      .muted{color:#6b7280}
+      .pill{display:inline-block; padding:2px 8px; border-radius:999px; font-size:12px; font-weight:500;}
+      .pill-blue{background:#dbeafe; color:#1d4ed8;}
+      .pill-gray{background:#f3f4f6; color:#374151;}
+      .pill-red{background:#fee2e2; color:#b91c1c;}
+      .pill-green{background:#dcfce7; color:#15803d;}
+      .btn{display:inline-flex; align-items:center; gap:6px; padding:5px 12px; border-radius:6px; font-size:13px; font-weight:500; cursor:pointer; border:1px solid #d1d5db; background:#fff; color:#374151; transition:background 0.15s;}
+      .btn:hover{background:#f9fafb;}
+      .btn:disabled{opacity:0.5; cursor:not-allowed;}
+      .btn-primary{background:#2563eb; color:#fff; border-color:#2563eb;}
+      .btn-primary:hover{background:#1d4ed8;}
       /* markdown rendered content */
-      .md-body h2{{font-size:15px; font-weight:600; margin:18px 0 6px; color:#1f2937; border-bottom:1px solid #f3f4f6; padding-bottom:4px;}}
-      .md-body h3{{font-size:14px; font-weight:600; margin:14px 0 4px; color:#374151;}}
-      .md-body p{{margin:4px 0 8px; line-height:1.6; font-size:14px;}}
-      .md-body ul,.md-body ol{{margin:4px 0 8px; padding-left:20px; font-size:14px; line-height:1.7;}}
-      .md-body li{{margin:2px 0;}}
-      .md-body strong{{color:#111827;}}
+      .md-body h2{font-size:15px; font-weight:600; margin:18px 0 6px; color:#1f2937; border-bottom:1px solid #f3f4f6; padding-bottom:4px;}
+      .md-body h3{font-size:14px; font-weight:600; margin:14px 0 4px; color:#374151;}
+      .md-body p{margin:4px 0 8px; line-height:1.6; font-size:14px;}
+      .md-body ul,.md-body ol{margin:4px 0 8px; padding-left:20px; font-size:14px; line-height:1.7;}
+      .md-body li{margin:2px 0;}
+      .md-body strong{color:#111827;}
       /* history table */
-      .hist-table{{width:100%; border-collapse:collapse; font-size:13px; margin-top:8px;}}
-      .hist-table th{{background:#f9fafb; text-align:left; padding:8px 10px; font-weight:600; color:#374151; border-bottom:2px solid #e5e7eb;}}
-      .hist-table td{{padding:7px 10px; border-bottom:1px solid #f3f4f6; vertical-align:top;}}
-      .hist-table tr:hover td{{background:#fafafa;}}
-      .action-taken{{color:#15803d; font-weight:500;}}
-      .action-rec{{color:#1d4ed8;}}
-      .action-err{{color:#b91c1c;}}
-      .no-history{{color:#6b7280; font-size:14px; font-style:italic;}}
-      .spinner{{display:inline-block; width:14px; height:14px; border:2px solid #d1d5db; border-top-color:#2563eb; border-radius:50%; animation:spin 0.6s linear infinite;}}
-      @keyframes spin{{to{{transform:rotate(360deg)}}}}
+      .hist-table{width:100%; border-collapse:collapse; font-size:13px; margin-top:8px;}
+      .hist-table th{background:#f9fafb; text-align:left; padding:8px 10px; font-weight:600; color:#374151; border-bottom:2px solid #e5e7eb;}
+      .hist-table td{padding:7px 10px; border-bottom:1px solid #f3f4f6; vertical-align:top;}
+      .hist-table tr:hover td{background:#fafafa;}
+      .action-taken{color:#15803d; font-weight:500;}
+      .action-rec{color:#1d4ed8;}
+      .action-err{color:#b91c1c;}
+      .no-history{color:#6b7280; font-size:14px; font-style:italic;}
+      .spinner{display:inline-block; width:14px; height:14px; border:2px solid #d1d5db; border-top-color:#2563eb; border-radius:50%; animation:spin 0.6s linear infinite;}
+      @keyframes spin{to{transform:rotate(360deg)}}
     </style>
   </head>
   <body>
     <div><a href="/">← Back to incidents</a></div>
-    <h2 style="margin:16px 0 4px">Incident {incident_id}</h2>
+    <h2 id="title" style="margin:16px 0 4px">Incident</h2>
     <div id="meta" class="muted" style="font-size:14px; margin-bottom:8px">Loading…</div>
 
     <div class="card">
@@ -207,51 +358,52 @@ def ui_incident(incident_id: int) -> str:
     <div class="card">
       <div class="card-header">
         <h3>Agent Timeline</h3>
+        <button class="btn" id="moreEvents" style="display:none" onclick="loadEvents()">Load more</button>
       </div>
       <pre id="events">Loading…</pre>
     </div>
 
-    <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
     <script>
-      function renderMd(md) {{
-        return (typeof marked !== 'undefined') ? marked.parse(md) : '<pre>' + md + '</pre>';
-      }}
+      // One static page serves every incident; the id comes from the URL.
+      const INCIDENT_ID = location.pathname.split('/').filter(Boolean).pop();
+      document.title = `Incident ${INCIDENT_ID}`;
+      document.getElementById('title').textContent = `Incident ${INCIDENT_ID}`;
 
-      function renderHistory(past) {{
+      function renderHistory(past) {
         const histEl = document.getElementById('history');
-        if (!past || !past.length) {{
+        if (!past || !past.length) {
           histEl.innerHTML = '<p class="no-history">No prior similar incidents found in the database.</p>';
           return;
-        }}
-        let rows = past.map(p => {{
+        }
+        let rows = past.map(p => {
           const actionCell = p.action_taken
-            ? `<span class="action-taken">✓ ${{p.action_taken}}</span>`
+            ? `<span class="action-taken">✓ ${p.action_taken}</span>`
             : p.action_recommended
-            ? `<span class="action-rec">→ ${{p.action_recommended}}</span>`
+            ? `<span class="action-rec">→ ${p.action_recommended}</span>`
             : p.action_error
-            ? `<span class="action-err">✗ ${{p.action_error}}</span>`
+            ? `<span class="action-err">✗ ${p.action_error}</span>`
             : '<span class="muted">—</span>';
           return `<tr>
-            <td><a href="/incident/${{p.id}}">#${{p.id}}</a></td>
-            <td>${{p.alertname||'-'}}</td>
-            <td>${{p.namespace||'-'}}/${{p.pod||'-'}}</td>
-            <td><span class="pill pill-gray">${{p.runbook_id||'-'}}</span></td>
-            <td>${{actionCell}}</td>
-            <td class="muted">${{(p.created_at||'').slice(0,19).replace('T',' ')}}</td>
+            <td><a href="/incident/${p.id}">#${p.id}</a></td>
+            <td>${p.alertname||'-'}</td>
+            <td>${p.namespace||'-'}/${p.pod||'-'}</td>
+            <td><span class="pill pill-gray">${p.runbook_id||'-'}</span></td>
+            <td>${actionCell}</td>
+            <td class="muted">${(p.created_at||'').slice(0,19).replace('T',' ')}</td>
           </tr>`;
-        }}).join('');
+        }).join('');
         histEl.innerHTML = `
-          <p class="muted" style="font-size:13px; margin:0 0 8px">${{past.length}} past incident(s) found for the same alert / resource.</p>
+          <p class="muted" style="font-size:13px; margin:0 0 8px">${past.length} past incident(s) found for the same alert / resource.</p>
           <table class="hist-table">
             <thead><tr>
               <th>#</th><th>Alert</th><th>NS / Pod</th><th>Runbook</th><th>Action outcome</th><th>When</th>
             </tr></thead>
-            <tbody>${{rows}}</tbody>
+            <tbody>${rows}</tbody>
           </table>`;
-      }}
+      }
 
-      async function load() {{
-        const res = await fetch('/api/incidents/{incident_id}');
+      async function load() {
+        const res = await fetch(`/api/incidents/${INCIDENT_ID}`);
         const data = await res.json();
         const inc = data.incident;
 
@@ -259,23 +411,40 @@ def ui_incident(incident_id: int) -> str:
                             : (inc.severity||'').toLowerCase() === 'warning'  ? 'pill-blue'
                             : 'pill-gray';
         document.getElementById('meta').innerHTML =
-          `<span class="pill pill-gray">${{inc.runbook_id||'-'}}</span> &nbsp;` +
-          `Alert: <b>${{inc.alertname||'-'}}</b> &nbsp;` +
-          `NS/Pod: <b>${{inc.namespace||'-'}}/${{inc.pod||'-'}}</b> &nbsp;` +
-          `<span class="pill ${{severityClass}}">${{inc.severity||'unknown'}}</span> &nbsp;` +
-          `Updated: ${{inc.updated_at||'-'}}`;
+          `<span class="pill pill-gray">${inc.runbook_id||'-'}</span> &nbsp;` +
+          `Alert: <b>${inc.alertname||'-'}</b> &nbsp;` +
+          `NS/Pod: <b>${inc.namespace||'-'}/${inc.pod||'-'}</b> &nbsp;` +
+          `<span class="pill ${severityClass}">${inc.severity||'unknown'}</span> &nbsp;` +
+          `Updated: ${inc.updated_at||'-'}`;
 
-        const md = data.analysis_markdown || '';
-        document.getElementById('analysis').innerHTML = md
-          ? renderMd(md)
-          : '<span class="muted">No analysis yet. Click Re-generate Analysis to create one.</span>';
+        document.getElementById('analysis').innerHTML = data.analysis_html
+          || '<span class="muted">No analysis yet. Click Re-generate Analysis to create one.</span>';
 
         renderHistory(data.past_incidents);
+      }
 
-        document.getElementById('events').innerText = JSON.stringify(data.events, null, 2);
-      }}
+      // Timeline is NDJSON, oldest-first; later pages load on demand via after_id.
+      const EVENTS_PAGE = 50;
+      let eventsAfterId = 0;
+      let eventsText = '';
+
+      async function loadEvents() {
+        const el = document.getElementById('events');
+        const more = document.getElementById('moreEvents');
+        more.disabled = true;
+        const res = await fetch(`/api/incidents/${INCIDENT_ID}/events?after_id=${eventsAfterId}&limit=${EVENTS_PAGE}`);
+        const lines = (await res.text()).split('\\n').filter(Boolean);
+        for (const line of lines) {
+          const evt = JSON.parse(line);
+          eventsAfterId = evt.id;
+          eventsText += JSON.stringify(evt, null, 2) + '\\n';
+        }
+        el.innerText = eventsText || 'No events recorded.';
+        more.disabled = false;
+        more.style.display = lines.length < EVENTS_PAGE ? 'none' : '';
+      }
 
-      async function regenAnalysis() {{
+      async function regenAnalysis() {
         const btn = document.getElementById('regenBtn');
         const statusEl = document.getElementById('regenStatus');
         btn.disabled = true;
@@ -283,104 +452,186 @@ def ui_incident(incident_id: int) -> str:
         statusEl.style.display = 'block';
         statusEl.innerHTML = '<span class="muted">Querying past incidents and re-generating analysis with history context…</span>';
 
-        try {{
-          const res = await fetch('/api/incidents/{incident_id}/regenerate-analysis', {{method: 'POST'}});
+        try {
+          const res = await fetch(`/api/incidents/${INCIDENT_ID}/regenerate-analysis`, {method: 'POST'});
           if (!res.ok) throw new Error(await res.text());
           const data = await res.json();
-          const md = data.analysis_markdown || '';
-          document.getElementById('analysis').innerHTML = md
-            ? renderMd(md)
-            : '<span class="muted">Generation returned empty.</span>';
+          document.getElementById('analysis').innerHTML = data.analysis_html
+            || '<span class="muted">Generation returned empty.</span>';
           statusEl.innerHTML = '<span style="color:#15803d">✓ Analysis regenerated with full history context.</span>';
-        }} catch(e) {{
-          statusEl.innerHTML = `<span style="color:#b91c1c">✗ Failed: ${{e.message}}</span>`;
-        }} finally {{
+        } catch(e) {
+          statusEl.innerHTML = `<span style="color:#b91c1c">✗ Failed: ${e.message}</span>`;
+        } finally {
           btn.disabled = false;
           btn.innerHTML = '↻ Re-generate Analysis';
-        }}
-      }}
+        }
+      }
 
       load();
+      loadEvents();
     </script>
   </body>
 </html>
-""".strip()
+""".strip().encode("utf-8")
+_INCIDENT_ETAG = _etag(_INCIDENT_HTML)
+
+
+@app.get("/", response_class=HTMLResponse)
+async def ui_index(request: Request) -> Response:
+    # Simple no-auth UI (MVP)
+    return _static_html(request, _INDEX_HTML, _INDEX_ETAG)
+
+
+@app.get("/incident/{incident_id}", response_class=HTMLResponse)
+async def ui_incident(incident_id: int, request: Request) -> Response:
+    # incident_id is still declared so non-numeric paths 422 as before.
+    return _static_html(request, _INCIDENT_HTML, _INCIDENT_ETAG)
+
+
+# The UI polls the list/detail endpoints; serve repeat reads from serialized bytes for a
+# couple of seconds and let clients revalidate by ETag. Keys carry db.write_version(), so
+# this process's own writes invalidate immediately.
+_api_cache: TTLCache = TTLCache(maxsize=1024, ttl=float(os.getenv("API_CACHE_TTL_SECONDS", "2")))
+
+
+async def _cached_json(request: Request, key: tuple, build: Callable[[], Awaitable[Any]]) -> Response:
+    key = (*key, write_version())
+    hit = _api_cache.get(key)
+    if hit is None:
+        body = _dumps(await build())
+        hit = (body, _etag(body))
+        _api_cache[key] = hit
+    body, etag = hit
+    headers = {"Cache-Control": "no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/incidents")
-def api_list_incidents(limit: int = 50, offset: int = 0) -> JSONResponse:
-    rows = list_incidents(limit=limit, offset=offset)
-    # Enrich with "node" from most recent webhook_received labels, if present.
-    out = []
-    for r in rows:
-        inc_id = int(r["id"])
-        latest_webhook = get_latest_event_by_type(incident_id=inc_id, event_type="webhook_received") or {}
-        labels = ((latest_webhook.get("payload") or {}).get("labels") or {}) if latest_webhook else {}
-        out.append({**r, "node": labels.get("node")})
-    return JSONResponse(content=jsonable_encoder({"incidents": out}))
+async def api_list_incidents(request: Request, limit: int = 50, offset: int = 0) -> Response:
+    async def build() -> Dict[str, Any]:
+        # Includes "node" from each incident's most recent webhook_received labels.
+        rows = await list_incidents_with_latest_webhook(limit=limit, offset=offset)
+        return {"incidents": rows}
+
+    return await _cached_json(request, ("list", limit, offset), build)
 
 
 @app.get("/api/incidents/{incident_id}")
-def api_get_incident(incident_id: int) -> JSONResponse:
-    inc = get_incident(incident_id=incident_id)
-    if not inc:
-        raise HTTPException(status_code=404, detail="incident not found")
-
-    events = list_incident_events(incident_id=incident_id, limit=200)
-    analysis_evt = get_latest_event_by_type(incident_id=incident_id, event_type="analysis") or {}
-    analysis_md = ((analysis_evt.get("payload") or {}).get("analysis_markdown") or "") if analysis_evt else ""
-
-    # Fetch past similar incidents so the UI can render the history table directly.
-    webhook_evt = get_latest_event_by_type(incident_id=incident_id, event_type="webhook_received") or {}
-    webhook_labels = ((webhook_evt.get("payload") or {}).get("labels") or {}) if webhook_evt else {}
-    past = get_similar_past_incidents(
-        current_incident_id=incident_id,
-        alertname=inc.get("alertname"),
-        namespace=inc.get("namespace"),
-        pod=inc.get("pod"),
-        node=webhook_labels.get("node"),
-    )
+async def api_get_incident(incident_id: int, request: Request) -> Response:
+    return await _cached_json(request, ("detail", incident_id), lambda: _incident_detail(incident_id))
+
+
+async def _incident_detail(incident_id: int) -> Dict[str, Any]:
+    # All reads share one pooled connection instead of borrowing one per query.
+    async with get_conn() as conn:
+        inc = await get_incident(incident_id=incident_id, conn=conn)
+        if not inc:
+            raise HTTPException(status_code=404, detail="incident not found")
+
+        analysis_evt = (
+            await get_latest_event_by_type(incident_id=incident_id, event_type="analysis", conn=conn) or {}
+        )
+        analysis_payload = (analysis_evt.get("payload") or {}) if analysis_evt else {}
+        analysis_md = analysis_payload.get("analysis_markdown") or ""
+        # Events written before server-side rendering only carry markdown.
+        analysis_html = analysis_payload.get("analysis_html") or _render_markdown(analysis_md)
+
+        # Fetch past similar incidents so the UI can render the history table directly.
+        webhook_evt = (
+            await get_latest_event_by_type(incident_id=incident_id, event_type="webhook_received", conn=conn) or {}
+        )
+        webhook_labels = ((webhook_evt.get("payload") or {}).get("labels") or {}) if webhook_evt else {}
+        past = await get_similar_past_incidents(
+            current_incident_id=incident_id,
+            alertname=inc.get("alertname"),
+            namespace=inc.get("namespace"),
+            pod=inc.get("pod"),
+            node=webhook_labels.get("node"),
+            conn=conn,
+        )
 
-    return JSONResponse(content=jsonable_encoder({
+    return {
         "incident": inc,
-        "events": list(reversed(events)),
+        "analysis_html": analysis_html,
         "analysis_markdown": analysis_md,
         "past_incidents": past,
-    }))
+    }
+
+
+_NDJSON_CHUNK_BYTES = 64 * 1024
 
 
-@app.post("/api/incidents/{incident_id}/regenerate-analysis")
-def api_regenerate_analysis(incident_id: int) -> JSONResponse:
+@app.get("/api/incidents/{incident_id}/events")
+async def api_list_incident_events(
+    incident_id: int,
+    after_id: int = 0,
+    limit: int = 100,
+    include_payload: bool = True,
+) -> StreamingResponse:
+    """
+    Stream an incident's events oldest-first as NDJSON (one JSON object per line).
+    Page by passing the last received event id as `after_id`. With
+    `include_payload=false` only id/incident_id/ts/event_type are sent.
+    """
+    limit = max(1, min(int(limit), 1000))
+
+    async def generate() -> AsyncIterator[bytes]:
+        # Coalesce lines into ~64 KiB chunks: one ASGI send (and gzip flush) per chunk
+        # instead of per event, while memory stays bounded for huge payloads.
+        buf = bytearray()
+        async for row in iter_incident_events(
+            incident_id=incident_id, after_id=after_id, limit=limit, include_payload=include_payload
+        ):
+            buf += _dumps(row, orjson.OPT_APPEND_NEWLINE)
+            if len(buf) >= _NDJSON_CHUNK_BYTES:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.post("/api/incidents/{incident_id}/regenerate-analysis", response_model=None)
+async def api_regenerate_analysis(incident_id: int, request: Request) -> Dict[str, Any]:
     """
     Re-generate the incident analysis on demand, incorporating full past-incident
     history context. Overwrites the stored 'analysis' event with the new result.
     """
-    inc = get_incident(incident_id=incident_id)
-    if not inc:
-        raise HTTPException(status_code=404, detail="incident not found")
-
-    # Reconstruct the final state and alert context from stored events.
-    final_evt = get_latest_event_by_type(incident_id=incident_id, event_type="final") or {}
-    final_state = ((final_evt.get("payload") or {}).get("state") or {}) if final_evt else {}
-    runbook_id = (final_evt.get("payload") or {}).get("runbook_id") or inc.get("runbook_id") or "RB_UNKNOWN"
-
-    webhook_evt = get_latest_event_by_type(incident_id=incident_id, event_type="webhook_received") or {}
-    webhook_payload = (webhook_evt.get("payload") or {}) if webhook_evt else {}
-    alert_labels = webhook_payload.get("labels") or {}
-    alert_annotations = webhook_payload.get("annotations") or {}
-    cluster = webhook_payload.get("cluster") or CLUSTER_NAME
-
-    # Fetch full history for this alert / resource.
-    past = get_similar_past_incidents(
-        current_incident_id=incident_id,
-        alertname=inc.get("alertname"),
-        namespace=inc.get("namespace"),
-        pod=inc.get("pod"),
-        node=alert_labels.get("node"),
-    )
+    # Reads share one connection, released before the (slow) LLM call.
+    async with get_conn() as conn:
+        inc = await get_incident(incident_id=incident_id, conn=conn)
+        if not inc:
+            raise HTTPException(status_code=404, detail="incident not found")
+
+        # Reconstruct the final state and alert context from stored events.
+        final_evt = await get_latest_event_by_type(incident_id=incident_id, event_type="final", conn=conn) or {}
+        final_state = ((final_evt.get("payload") or {}).get("state") or {}) if final_evt else {}
+        runbook_id = (final_evt.get("payload") or {}).get("runbook_id") or inc.get("runbook_id") or "RB_UNKNOWN"
+
+        webhook_evt = (
+            await get_latest_event_by_type(incident_id=incident_id, event_type="webhook_received", conn=conn) or {}
+        )
+        webhook_payload = (webhook_evt.get("payload") or {}) if webhook_evt else {}
+        alert_labels = webhook_payload.get("labels") or {}
+        alert_annotations = webhook_payload.get("annotations") or {}
+        cluster = webhook_payload.get("cluster") or CLUSTER_NAME
+
+        # Fetch full history for this alert / resource.
+        past = await get_similar_past_incidents(
+            current_incident_id=incident_id,
+            alertname=inc.get("alertname"),
+            namespace=inc.get("namespace"),
+            pod=inc.get("pod"),
+            node=alert_labels.get("node"),
+            conn=conn,
+        )
 
     try:
-        analysis_md = generate_incident_analysis(
+        analysis_md = await generate_incident_analysis(
+            request.app.state.llm,
             runbook_id=str(runbook_id),
             cluster=cluster,
             alert_labels=alert_labels,
@@ -392,147 +643,410 @@ def api_regenerate_analysis(incident_id: int) -> JSONResponse:
         logger.exception("regenerate_analysis_failed incident_id=%s error=%s", incident_id, e)
         raise HTTPException(status_code=500, detail=f"analysis generation failed: {e}") from e
 
+    analysis_html = _render_markdown(analysis_md)
     if analysis_md:
-        add_event(
+        await add_event(
             incident_id=incident_id,
             event_type="analysis",
-            payload={"analysis_markdown": analysis_md, "runbook_id": runbook_id, "regenerated": True},
+            payload={
+                "analysis_markdown": analysis_md,
+                "analysis_html": analysis_html,
+                "runbook_id": runbook_id,
+                "regenerated": True,
+            },
         )
 
-    return JSONResponse(content={"analysis_markdown": analysis_md, "past_incidents_count": len(past)})
+    return {
+        "analysis_html": analysis_html,
+        "analysis_markdown": analysis_md,
+        "past_incidents_count": len(past),
+    }
+
+
+# Fingerprints being processed by this process. Duplicates within the process are
+# suppressed here without a DB round-trip; the Postgres lock is only needed
+# to dedupe against other worker processes or replicas. All access happens on the
+# event loop thread, so check-and-add needs no lock.
+_inflight: set[str] = set()
+_CROSS_PROCESS_DEDUP = REPLICAS * WEB_CONCURRENCY > 1
+# Cross-process dedupe backend: "lease" (a row in incident_locks, no connection held while
+# processing) or "advisory" (a session advisory lock pinning one pooled connection).
+DEDUP_LOCK = os.getenv("DEDUP_LOCK", "lease")
+LOCK_LEASE_SECONDS = int(os.getenv("LOCK_LEASE_SECONDS", "300"))
+# How far back the startup scan looks for alerts that were accepted but never finished. Alerts
+# younger than LOCK_LEASE_SECONDS are skipped: a sibling worker may still have them queued.
+UNFINISHED_SCAN_SECONDS = int(os.getenv("UNFINISHED_SCAN_SECONDS", "3600"))
+
+
+def _dedupe_lock(fp: str):
+    if not _CROSS_PROCESS_DEDUP:
+        return nullcontext(True)
+    if DEDUP_LOCK == "advisory":
+        return advisory_lock(fp)
+    return lease_lock(fp, LOCK_LEASE_SECONDS)
+
+
+def _claim_inflight(fp: str) -> bool:
+    if fp in _inflight:
+        return False
+    _inflight.add(fp)
+    return True
+
+
+def _release_inflight(fp: str) -> None:
+    _inflight.discard(fp)
+
+
+# groupKey values Alertmanager sends when the route has no group_by labels.
+_GK_EMPTY = frozenset({"{}/{}", "{}"})
+
+
+def _fingerprint_for(group_key: Optional[str], alert: Alert, labels: Dict[str, str]) -> str:
+    fp = alert.fingerprint or group_key
+    if fp:
+        return fp
+    labels_get = labels.get
+    return ":".join(
+        (
+            labels_get("alertname", "unknown"),
+            labels_get("namespace", ""),
+            labels_get("pod", ""),
+            labels_get("container", ""),
+        )
+    )
+
 
+# Repeat firings with the same labels, outcome and history get the same analysis, so the
+# LLM call is skipped for them. The on-demand regenerate endpoint never reads this cache.
+_analysis_cache: TTLCache = TTLCache(
+    maxsize=int(os.getenv("ANALYSIS_CACHE_SIZE", "2048")),
+    ttl=int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600")),
+)
+_OUTCOME_KEYS = ("action_taken", "action_recommended", "action_error")
+
+
+def _analysis_cache_key(
+    *,
+    runbook_id: Optional[str],
+    labels: Dict[str, str],
+    annotations: Dict[str, str],
+    final_state: Dict[str, Any],
+    past: List[Dict[str, Any]],
+) -> bytes:
+    raw = orjson.dumps(
+        (
+            runbook_id,
+            CLUSTER_NAME,
+            sorted(labels.items()),
+            sorted(annotations.items()),
+            [final_state.get(k) for k in _OUTCOME_KEYS],
+            [p.get("id") for p in past],
+        ),
+        default=str,
+    )
+    return hashlib.blake2b(raw, digest_size=16).digest()
 
-def _fingerprint_for(webhook: AlertmanagerWebhook, alert: Alert, labels: Dict[str, str]) -> str:
-    if alert.fingerprint:
-        return alert.fingerprint
-    if webhook.groupKey and webhook.groupKey not in {"{}/{}", "{}"}:
-        return webhook.groupKey
 
-    alertname = labels.get("alertname", "unknown")
-    namespace = labels.get("namespace", "")
-    pod = labels.get("pod", "")
-    container = labels.get("container", "")
-    return f"{alertname}:{namespace}:{pod}:{container}"
+def _run_graph(state: Dict[str, Any]) -> Dict[str, Any]:
+    return _get_graph().invoke(state)
 
 
-@app.post("/alertmanager")
-def alertmanager(webhook: AlertmanagerWebhook, request: Request) -> Dict[str, Any]:
-    logger.info(
-        "webhook_received receiver=%s status=%s alerts=%d remote=%s",
-        webhook.receiver,
-        webhook.status,
-        len(webhook.alerts),
-        request.client.host if request.client else "unknown",
+async def _process_alert(
+    *,
+    incident_id: int,
+    fp: str,
+    labels: Dict[str, str],
+    annotations: Dict[str, str],
+    events: List[Dict[str, Any]],
+    llm: Any,
+) -> Dict[str, Any]:
+    """
+    Run the graph for one claimed alert. Its final/analysis events are appended to `events`;
+    the caller writes them together with the runbook_id update.
+    """
+    state = {
+        "alert_labels": labels,
+        "agent_mode": AGENT_MODE,
+        "cluster": CLUSTER_NAME,
+        "fingerprint": fp,
+        "incident_id": incident_id,
+    }
+
+    # The graph makes blocking Kubernetes/LLM calls; keep it off the event loop.
+    out = await asyncio.to_thread(_run_graph, state)
+
+    runbook_id = out.get("runbook_id")
+
+    events.append(
+        {
+            "incident_id": incident_id,
+            "event_type": "final",
+            "payload": {"runbook_id": runbook_id, "state": out},
+        }
     )
 
-    if not webhook.alerts:
-        return {"received": 0, "results": []}
+    # Generate and persist analysis (best-effort).
+    try:
+        past = await get_similar_past_incidents(
+            current_incident_id=incident_id,
+            alertname=labels.get("alertname"),
+            namespace=labels.get("namespace"),
+            pod=labels.get("pod"),
+            node=labels.get("node"),
+        )
+        cache_key = _analysis_cache_key(
+            runbook_id=runbook_id,
+            labels=labels,
+            annotations=annotations,
+            final_state=out,
+            past=past,
+        )
+        cached = _analysis_cache.get(cache_key)
+        if cached:
+            analysis_md, analysis_html = cached
+        else:
+            analysis_md = await generate_incident_analysis(
+                llm,
+                runbook_id=str(runbook_id or "RB_UNKNOWN"),
+                cluster=CLUSTER_NAME,
+                alert_labels=labels,
+                alert_annotations=annotations,
+                final_state=out,
+                past_incidents=past or None,
+            )
+            analysis_html = _render_markdown(analysis_md)
+            if analysis_md:
+                _analysis_cache[cache_key] = (analysis_md, analysis_html)
+        if analysis_md:
+            events.append(
+                {
+                    "incident_id": incident_id,
+                    "event_type": "analysis",
+                    "payload": {
+                        "analysis_markdown": analysis_md,
+                        "analysis_html": analysis_html,
+                        "runbook_id": runbook_id,
+                    },
+                }
+            )
+    except Exception as e:
+        logger.warning("analysis_generation_failed incident_id=%s error=%s", incident_id, e)
 
-    results: List[Dict[str, Any]] = []
+    return {
+        "fingerprint": fp,
+        "status": "handled",
+        "runbook_id": runbook_id,
+    }
 
+
+# Graph runs and LLM analysis happen in background tasks so the webhook returns as soon as
+# intake is persisted (Alertmanager retries on slow responses). Task references are kept
+# so they are not garbage-collected mid-flight; the semaphore bounds concurrent runs.
+_background_tasks: set[asyncio.Task] = set()
+_process_slots = asyncio.Semaphore(int(os.getenv("PROCESS_CONCURRENCY", "8")))
+# Queued work lives only in this process's memory and is lost if the worker dies before it
+# finishes. Past this many pending tasks the webhook answers 503 before intake, so
+# Alertmanager keeps the alerts and retries instead of the backlog growing without bound.
+MAX_PENDING_ALERTS = int(os.getenv("MAX_PENDING_ALERTS", "256"))
+
+
+async def _handle_alert(
+    *, incident_id: int, fp: str, labels: Dict[str, str], annotations: Dict[str, str], llm: Any
+) -> None:
+    """
+    Background task for an alert whose fingerprint intake already claimed in `_inflight`:
+    take the cross-process lock, process, flush events, and release the claim.
+    """
+    events: List[Dict[str, Any]] = []
+    result: Optional[Dict[str, Any]] = None
     try:
-        for a in webhook.alerts:
-            labels = dict(webhook.commonLabels or {})
-            labels.update(a.labels or {})
-
-            fp = _fingerprint_for(webhook, a, labels)
-
-            incident = upsert_incident(
-                fingerprint=fp,
-                alertname=labels.get("alertname"),
-                namespace=labels.get("namespace"),
-                pod=labels.get("pod"),
-                severity=labels.get("severity"),
-                agent_mode=AGENT_MODE,
+        try:
+            async with _process_slots:
+                async with _dedupe_lock(fp) as locked:
+                    if locked:
+                        result = await _process_alert(
+                            incident_id=incident_id,
+                            fp=fp,
+                            labels=labels,
+                            annotations=annotations,
+                            events=events,
+                            llm=llm,
+                        )
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info(
+                                "alert_processed incident_id=%s fingerprint=%s runbook_id=%s",
+                                incident_id,
+                                fp,
+                                result.get("runbook_id"),
+                            )
+        finally:
+            _release_inflight(fp)
+
+        if not locked:
+            events.append(
+                {
+                    "incident_id": incident_id,
+                    "event_type": "suppressed",
+                    "payload": {"reason": "dedupe_lock_busy", "fingerprint": fp},
+                }
             )
+    except Exception as e:
+        logger.exception("alert_processing_failed incident_id=%s fingerprint=%s error=%s", incident_id, fp, e)
+    finally:
+        try:
+            if events or result:
+                # Runbook and outcome events land in one transaction (one commit).
+                async with transaction() as conn:
+                    if result:
+                        await update_incident_runbook(incident_id, result.get("runbook_id"), conn=conn)
+                    await add_events(events, conn=conn)
+        except Exception as e:
+            logger.exception("alert_events_write_failed incident_id=%s error=%s", incident_id, e)
 
-            add_event(
-                incident_id=int(incident["id"]),
-                event_type="webhook_received",
-                payload={
-                    "cluster": CLUSTER_NAME,
-                    "alert_status": a.status,
-                    "webhook_status": webhook.status,
-                    "labels": labels,
-                    "annotations": a.annotations or {},
-                    "startsAt": a.startsAt,
-                    "endsAt": a.endsAt,
-                    "fingerprint": fp,
-                },
-            )
 
-            if not try_advisory_lock(fp):
-                add_event(
-                    incident_id=int(incident["id"]),
-                    event_type="suppressed",
-                    payload={"reason": "dedupe_lock_busy", "fingerprint": fp},
-                )
-                results.append({"fingerprint": fp, "status": "suppressed"})
-                continue
-
-            try:
-                state = {
-                    "alert_labels": labels,
-                    "agent_mode": AGENT_MODE,
-                    "cluster": CLUSTER_NAME,
-                    "fingerprint": fp,
-                    "incident_id": int(incident["id"]),
-                }
+async def _report_unfinished_alerts() -> None:
+    """
+    Log incidents whose last webhook was accepted but never got an outcome event, e.g. because
+    a previous worker was killed with alerts still queued. The scan runs in one process at a
+    time and marks what it reports, so each alert is logged once; alerts still leased by, or
+    recently queued on, a live worker are left out. They are not re-run automatically.
+    """
+    try:
+        rows = await mark_unfinished_incidents(
+            since_seconds=UNFINISHED_SCAN_SECONDS, min_age_seconds=LOCK_LEASE_SECONDS
+        )
+    except Exception as e:
+        logger.warning("unfinished_alerts_scan_failed error=%s", e)
+        return
+    if rows:
+        logger.warning(
+            "unfinished_alerts count=%d incident_ids=%s",
+            len(rows),
+            ",".join(str(r["id"]) for r in rows),
+        )
 
-                out = graph.invoke(state)
 
-                runbook_id = out.get("runbook_id")
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
-                update_incident_runbook(int(incident["id"]), runbook_id)
 
-                add_event(
-                    incident_id=int(incident["id"]),
-                    event_type="final",
-                    payload={"runbook_id": runbook_id, "state": out},
-                )
+@app.post("/alertmanager", status_code=202, response_model=None)
+async def alertmanager(request: Request) -> Dict[str, Any]:
+    raw = await request.body()
+    try:
+        webhook = _webhook_decoder.decode(raw)
+    except msgspec.DecodeError as e:
+        # ValidationError is a DecodeError; both are the client's fault.
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    if logger.isEnabledFor(logging.INFO):
+        remote = request.client.host if request.client else "unknown"
+        logger.info(
+            "webhook_received receiver=%s status=%s alerts=%d remote=%s",
+            webhook.receiver,
+            webhook.status,
+            len(webhook.alerts),
+            remote,
+        )
 
-                # Generate and persist analysis (best-effort).
+    if not webhook.alerts:
+        return {"received": 0, "status": "queued"}
+
+    if len(_background_tasks) >= MAX_PENDING_ALERTS:
+        logger.warning("webhook_rejected reason=backlog_full pending=%d", len(_background_tasks))
+        raise HTTPException(status_code=503, detail="alert backlog full", headers={"Retry-After": "10"})
+
+    try:
+        intake: List[tuple] = []
+        failed_fps: List[str] = []
+        suppressed = 0
+        # webhook_received events are buffered and written in one round-trip.
+        pending: List[Dict[str, Any]] = []
+        # Per-webhook values, computed once rather than per alert.
+        base = webhook.commonLabels or {}
+        group_key = webhook.groupKey if webhook.groupKey and webhook.groupKey not in _GK_EMPTY else None
+        # Intake for the whole webhook runs on one connection and commits once.
+        async with transaction() as conn:
+            for a in webhook.alerts:
+                labels = {**base, **(a.labels or {})}
+
+                fp = _fingerprint_for(group_key, a, labels)
+
+                # A savepoint per alert: one failed upsert is skipped without aborting the batch.
                 try:
-                    past = get_similar_past_incidents(
-                        current_incident_id=int(incident["id"]),
-                        alertname=labels.get("alertname"),
-                        namespace=labels.get("namespace"),
-                        pod=labels.get("pod"),
-                        node=labels.get("node"),
-                    )
-                    analysis_md = generate_incident_analysis(
-                        runbook_id=str(runbook_id or "RB_UNKNOWN"),
-                        cluster=CLUSTER_NAME,
-                        alert_labels=labels,
-                        alert_annotations=a.annotations or {},
-                        final_state=out,
-                        past_incidents=past or None,
-                    )
-                    if analysis_md:
-                        add_event(
-                            incident_id=int(incident["id"]),
-                            event_type="analysis",
-                            payload={"analysis_markdown": analysis_md, "runbook_id": runbook_id},
+                    async with conn.transaction():
+                        incident = await upsert_incident(
+                            fingerprint=fp,
+                            alertname=labels.get("alertname"),
+                            namespace=labels.get("namespace"),
+                            pod=labels.get("pod"),
+                            severity=labels.get("severity"),
+                            agent_mode=AGENT_MODE,
+                            conn=conn,
                         )
                 except Exception as e:
-                    logger.warning("analysis_generation_failed incident_id=%s error=%s", incident["id"], e)
+                    failed_fps.append(fp)
+                    logger.exception("alert_intake_failed fingerprint=%s error=%s", fp, e)
+                    continue
+                incident_id = int(incident["id"])
 
-                results.append(
+                pending.append(
                     {
-                        "fingerprint": fp,
-                        "status": "handled",
-                        "runbook_id": runbook_id,
+                        "incident_id": incident_id,
+                        "event_type": "webhook_received",
+                        "payload": {
+                            "cluster": CLUSTER_NAME,
+                            "alert_status": a.status,
+                            "webhook_status": webhook.status,
+                            "labels": labels,
+                            "annotations": a.annotations or {},
+                            "startsAt": a.startsAt,
+                            "endsAt": a.endsAt,
+                            "fingerprint": fp,
+                        },
                     }
                 )
-            finally:
-                advisory_unlock(fp)
+                # Coalesce: a fingerprint this process is already handling (or that repeats within
+                # this webhook) is suppressed here, in the intake batch, without a task or lock.
+                if _claim_inflight(fp):
+                    intake.append((incident_id, fp, labels, a.annotations or {}))
+                else:
+                    suppressed += 1
+                    pending.append(
+                        {
+                            "incident_id": incident_id,
+                            "event_type": "suppressed",
+                            "payload": {"reason": "dedupe_inflight", "fingerprint": fp},
+                        }
+                    )
 
-        return {"received": len(webhook.alerts), "results": results}
+            await add_events(pending, conn=conn)
+        failed = len(failed_fps)
+        # A 2xx tells Alertmanager the whole batch was delivered. If alerts failed and nothing
+        # was queued, answer 5xx so it redelivers; the resend is deduplicated by fingerprint.
+        if failed and not intake:
+            raise RuntimeError(f"{failed} alerts failed intake and none were queued")
     except Exception as e:
+        # Nothing was dispatched; give back the fingerprints claimed above.
+        for _, claimed_fp, _, _ in intake:
+            _release_inflight(claimed_fp)
         logger.exception("webhook_processing_failed error=%s", e)
-        try:
-            body = json.dumps(webhook.model_dump(), default=str)[:4000]
-            logger.error("webhook_payload_preview=%s", body)
-        except Exception:
-            pass
+        if logger.isEnabledFor(logging.DEBUG):
+            # The raw body is already in memory; no re-serialization of the decoded webhook.
+            logger.debug("webhook_payload_preview=%s", raw[:4000].decode("utf-8", "replace"))
         raise HTTPException(status_code=500, detail="webhook processing failed") from e
+
+    if failed_fps:
+        # Acknowledged with the rest of the batch, so Alertmanager will not redeliver these.
+        logger.error("alert_intake_dropped failed=%d fingerprints=%s", failed, ",".join(failed_fps))
+
+    # Only dispatch once intake is durable, so every queued alert has its webhook_received event.
+    llm = request.app.state.llm
+    for incident_id, fp, labels, alert_annotations in intake:
+        _spawn(
+            _handle_alert(incident_id=incident_id, fp=fp, labels=labels, annotations=alert_annotations, llm=llm)
+        )
+
+    return {"received": len(webhook.alerts), "failed": failed, "suppressed": suppressed, "status": "queued"}
@@ -1,17 +1,67 @@
 from __future__ import annotations
 
+import heapq
 import logging
-import math
-import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 from typing import Any, Dict, List, Optional, Tuple
 
-from kubernetes import client, config
+import orjson
+import urllib3
+from kubernetes import client, config, watch
 
+from agent import tools_cache
 from agent.runbook_loader import load_runbook
 
 logger = logging.getLogger("agentic_sre.tools")
 
+# API clients are built once per process: loading the in-cluster config re-reads the
+# service account token/CA, and sharing the ApiClient keeps its HTTPS pool warm.
+_clients_lock = threading.Lock()
+_core_v1: Optional[client.CoreV1Api] = None
+_apps_v1: Optional[client.AppsV1Api] = None
+_policy_v1: Optional[client.PolicyV1Api] = None
+# Same credentials, but urllib3 retries disabled, for calls with a hard time budget: the
+# default Retry(total=3) re-sends a timed-out request, so one call could take 4x its timeout.
+_core_v1_once: Optional[client.CoreV1Api] = None
+
+
+def _k8s() -> Tuple[client.CoreV1Api, client.AppsV1Api, client.PolicyV1Api]:
+    global _core_v1, _apps_v1, _policy_v1
+    with _clients_lock:
+        if _core_v1 is None:
+            try:
+                config.load_incluster_config()
+            except config.ConfigException:
+                # Outside a pod (local runs against a dev cluster): use ~/.kube/config.
+                config.load_kube_config()
+            _core_v1 = client.CoreV1Api()
+            _apps_v1 = client.AppsV1Api()
+            _policy_v1 = client.PolicyV1Api()
+            tools_cache.start(_core_v1, _apps_v1)
+        return _core_v1, _apps_v1, _policy_v1
+
+
+def _k8s_single_attempt() -> client.CoreV1Api:
+    global _core_v1_once
+    _k8s()  # loads the cluster config into the default Configuration
+    with _clients_lock:
+        if _core_v1_once is None:
+            cfg = client.Configuration.get_default_copy()
+            cfg.retries = False
+            _core_v1_once = client.CoreV1Api(client.ApiClient(cfg))
+        return _core_v1_once
+
+
+def _read_pod(namespace: str, pod: str) -> client.V1Pod:
+    p = tools_cache.get_pod(namespace, pod)
+    if p is None:
+        core_v1, _, _ = _k8s()
+        p = core_v1.read_namespaced_pod(name=pod, namespace=namespace)
+    return p
+
 
 def tool_get_runbook(*, runbook_id: str) -> Dict[str, Any]:
     """
@@ -42,6 +92,68 @@ def tool_get_runbook(*, runbook_id: str) -> Dict[str, Any]:
     }
 
 
+# A pod's owner chain never changes, so remediation retries/verify loops can skip the
+# Pod -> ReplicaSet -> Deployment walk (two API reads) for a while.
+_OWNER_CACHE_TTL_SECONDS = 60.0
+_OWNER_CACHE_MAX = 1024
+_OWNER_CACHE: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+
+
+def _resolve_deployment(namespace: str, pod: str) -> Optional[str]:
+    """Return the name of the Deployment owning `pod`, or None if it has none."""
+    key = (namespace, pod)
+    now = time.monotonic()
+    hit = _OWNER_CACHE.get(key)
+    if hit is not None and now - hit[0] < _OWNER_CACHE_TTL_SECONDS:
+        return hit[1]
+
+    _, apps_v1, _ = _k8s()
+    p = _read_pod(namespace, pod)
+
+    # An object has at most one controlling owner; follow only that reference at each hop.
+    deployment: Optional[str] = None
+    ref = next((r for r in (p.metadata.owner_references or ()) if r.kind == "ReplicaSet" and r.controller), None)
+    if ref is not None:
+        rs = apps_v1.read_namespaced_replica_set(name=ref.name, namespace=namespace)
+        rs_ref = next((r for r in (rs.metadata.owner_references or ()) if r.kind == "Deployment" and r.controller), None)
+        if rs_ref is not None:
+            deployment = rs_ref.name
+
+    if len(_OWNER_CACHE) >= _OWNER_CACHE_MAX:
+        _OWNER_CACHE.clear()
+    _OWNER_CACHE[key] = (now, deployment)
+    return deployment
+
+
+_FIELD_MANAGER = "agentic-sre"
+
+
+def _apply_deployment_container(
+    apps_v1: client.AppsV1Api, *, namespace: str, deployment: str, container: Dict[str, Any], owner: str
+) -> None:
+    """
+    Server-Side Apply a single container's fields onto a Deployment's pod template.
+
+    Each tool applies under its own field manager (`agentic-sre-<owner>`): with SSA, fields a
+    manager previously applied but omits from its next apply are removed, so the image and
+    memory-limit fixes must not share one.
+    """
+    body = {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": deployment, "namespace": namespace},
+        "spec": {"template": {"spec": {"containers": [container]}}},
+    }
+    apps_v1.patch_namespaced_deployment(
+        name=deployment,
+        namespace=namespace,
+        body=body,
+        field_manager=f"{_FIELD_MANAGER}-{owner}",
+        force=True,
+        _content_type="application/apply-patch+yaml",
+    )
+
+
 def tool_fix_imagepullbackoff(
     *,
     namespace: str,
@@ -60,23 +172,8 @@ def tool_fix_imagepullbackoff(
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        apps_v1 = client.AppsV1Api()
-        core_v1 = client.CoreV1Api()
-
-        p = core_v1.read_namespaced_pod(name=pod, namespace=namespace)
-
-        deployment: Optional[str] = None
-        for ref in (p.metadata.owner_references or []):
-            if ref.kind != "ReplicaSet":
-                continue
-            rs = apps_v1.read_namespaced_replica_set(name=ref.name, namespace=namespace)
-            for rs_ref in (rs.metadata.owner_references or []):
-                if rs_ref.kind == "Deployment":
-                    deployment = rs_ref.name
-                    break
-            if deployment:
-                break
+        _, apps_v1, _ = _k8s()
+        deployment = _resolve_deployment(namespace, pod)
 
         if not deployment:
             logger.warning("tool=fix_imagepullbackoff ns=%s pod=%s ok=false error=pod_not_owned_by_deployment", namespace, pod)
@@ -85,16 +182,13 @@ def tool_fix_imagepullbackoff(
         action_msg = f"patch_image:{namespace}/{deployment}/{container}:{fallback_image}"
 
         if mode == "auto":
-            patch = {
-                "spec": {
-                    "template": {
-                        "spec": {
-                            "containers": [{"name": container, "image": fallback_image}],
-                        }
-                    }
-                }
-            }
-            apps_v1.patch_namespaced_deployment(name=deployment, namespace=namespace, body=patch)
+            _apply_deployment_container(
+                apps_v1,
+                namespace=namespace,
+                deployment=deployment,
+                container={"name": container, "image": fallback_image},
+                owner="image",
+            )
             logger.info("tool=fix_imagepullbackoff ok=true mode=auto ns=%s deployment=%s", namespace, deployment)
             return {"ok": True, "action": action_msg, "deployment": deployment, "mode": "auto"}
 
@@ -105,16 +199,15 @@ def tool_fix_imagepullbackoff(
         return {"ok": False, "error": str(e)}
 
 
-_MEMORY_UNITS_BINARY = {
+# Binary (Mi/Gi) and decimal (M/G) memory suffixes; "" is a plain byte count.
+_MEM_UNITS = {
+    "": 1,
     "Ki": 1024,
     "Mi": 1024**2,
     "Gi": 1024**3,
     "Ti": 1024**4,
     "Pi": 1024**5,
     "Ei": 1024**6,
-}
-
-_MEMORY_UNITS_DECIMAL = {
     "K": 1000,
     "M": 1000**2,
     "G": 1000**3,
@@ -123,6 +216,8 @@ _MEMORY_UNITS_DECIMAL = {
     "E": 1000**6,
 }
 
+_QTY_NUM_CHARS = frozenset("0123456789.")
+
 
 def _parse_k8s_quantity_bytes(qty: str) -> int:
     """
@@ -133,27 +228,36 @@ def _parse_k8s_quantity_bytes(qty: str) -> int:
     if not s:
         raise ValueError("empty_quantity")
 
-    m = re.fullmatch(r"([0-9]+(?:\.[0-9]+)?)([a-zA-Z]+)?", s)
-    if not m:
+    # Single scan for the number/suffix boundary; no regex on this path.
+    i, n = 0, len(s)
+    while i < n and s[i] in _QTY_NUM_CHARS:
+        i += 1
+    num_s, unit = s[:i], s[i:]
+    # Same grammar as [0-9]+(\.[0-9]+)?[a-zA-Z]*: digits on both sides of at most one '.',
+    # and a purely alphabetic suffix (anything else is malformed, not an unknown unit).
+    if (
+        not num_s
+        or num_s[0] == "."
+        or num_s[-1] == "."
+        or num_s.count(".") > 1
+        or (unit and not (unit.isascii() and unit.isalpha()))
+    ):
         raise ValueError(f"invalid_quantity:{qty}")
-
-    num_s, unit = m.group(1), m.group(2) or ""
     num = float(num_s)
 
-    if unit in _MEMORY_UNITS_BINARY:
-        return int(num * _MEMORY_UNITS_BINARY[unit])
-    if unit in _MEMORY_UNITS_DECIMAL:
-        return int(num * _MEMORY_UNITS_DECIMAL[unit])
-    if unit == "":
-        return int(num)
+    try:
+        return int(num * _MEM_UNITS[unit])
+    except KeyError:
+        # Kubernetes also supports 'm' for CPU, but not for memory. Treat as invalid here.
+        raise ValueError(f"unsupported_quantity_unit:{unit}") from None
+
 
-    # Kubernetes also supports 'm' for CPU, but not for memory. Treat as invalid here.
-    raise ValueError(f"unsupported_quantity_unit:{unit}")
+_MI = 1 << 20
 
 
 def _bytes_to_mi_rounded_up(n_bytes: int) -> Tuple[int, str]:
-    mi = 1024**2
-    n_mi = int(math.ceil(max(0, n_bytes) / mi))
+    # Integer ceil-div: exact for any size, no float round trip.
+    n_mi = (max(0, n_bytes) + _MI - 1) >> 20
     return n_mi, f"{n_mi}Mi"
 
 
@@ -180,39 +284,23 @@ def tool_increase_memory_limit(
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        apps_v1 = client.AppsV1Api()
-        core_v1 = client.CoreV1Api()
-
-        p = core_v1.read_namespaced_pod(name=pod, namespace=namespace)
-
-        deployment: Optional[str] = None
-        for ref in (p.metadata.owner_references or []):
-            if ref.kind != "ReplicaSet":
-                continue
-            rs = apps_v1.read_namespaced_replica_set(name=ref.name, namespace=namespace)
-            for rs_ref in (rs.metadata.owner_references or []):
-                if rs_ref.kind == "Deployment":
-                    deployment = rs_ref.name
-                    break
-            if deployment:
-                break
+        _, apps_v1, _ = _k8s()
+        deployment = _resolve_deployment(namespace, pod)
 
         if not deployment:
             logger.warning("tool=increase_memory_limit ns=%s pod=%s ok=false error=pod_not_owned_by_deployment", namespace, pod)
             return {"ok": False, "error": "pod_not_owned_by_deployment"}
 
-        d = apps_v1.read_namespaced_deployment(name=deployment, namespace=namespace)
-        tmpl = getattr(getattr(d, "spec", None), "template", None)
-        pod_spec = getattr(tmpl, "spec", None) if tmpl else None
-        containers = list(getattr(pod_spec, "containers", None) or [])
+        d = tools_cache.get_deployment(namespace, deployment) or apps_v1.read_namespaced_deployment(
+            name=deployment, namespace=namespace
+        )
+        containers = d.spec.template.spec.containers or ()
 
         current_limit: Optional[str] = None
         for c in containers:
-            if getattr(c, "name", None) != container:
+            if c.name != container:
                 continue
-            resources = getattr(c, "resources", None)
-            limits = getattr(resources, "limits", None) if resources else None
+            limits = c.resources.limits if c.resources else None
             if limits and isinstance(limits, dict):
                 current_limit = limits.get("memory")
             break
@@ -226,7 +314,7 @@ def tool_increase_memory_limit(
             )
             return {"ok": False, "error": "missing_current_memory_limit"}
 
-        cur_bytes = _parse_k8s_quantity_bytes(str(current_limit))
+        cur_bytes = _parse_k8s_quantity_bytes(current_limit)
         min_bytes = _parse_k8s_quantity_bytes(str(min_limit))
         max_bytes = _parse_k8s_quantity_bytes(str(max_limit))
         if cur_bytes >= max_bytes:
@@ -244,8 +332,8 @@ def tool_increase_memory_limit(
                 "reason": "current_limit_at_or_above_max",
                 "deployment": deployment,
                 "container": container,
-                "old_limit": str(current_limit),
-                "new_limit": str(current_limit),
+                "old_limit": current_limit,
+                "new_limit": current_limit,
                 "mode": mode,
             }
         if cur_bytes < min_bytes:
@@ -260,29 +348,21 @@ def tool_increase_memory_limit(
         action_msg = f"patch_memory_limit:{namespace}/{deployment}/{container}:{current_limit}->{new_limit}"
 
         if mode == "auto":
-            patch = {
-                "spec": {
-                    "template": {
-                        "spec": {
-                            "containers": [
-                                {
-                                    "name": container,
-                                    "resources": {"limits": {"memory": new_limit}},
-                                }
-                            ]
-                        }
-                    }
-                }
-            }
-            apps_v1.patch_namespaced_deployment(name=deployment, namespace=namespace, body=patch)
+            _apply_deployment_container(
+                apps_v1,
+                namespace=namespace,
+                deployment=deployment,
+                container={"name": container, "resources": {"limits": {"memory": new_limit}}},
+                owner="memory",
+            )
             logger.info("tool=increase_memory_limit ok=true mode=auto ns=%s deployment=%s", namespace, deployment)
             return {
                 "ok": True,
                 "action": action_msg,
                 "deployment": deployment,
                 "container": container,
-                "old_limit": str(current_limit),
-                "new_limit": str(new_limit),
+                "old_limit": current_limit,
+                "new_limit": new_limit,
                 "mode": "auto",
             }
 
@@ -292,8 +372,8 @@ def tool_increase_memory_limit(
             "action": action_msg,
             "deployment": deployment,
             "container": container,
-            "old_limit": str(current_limit),
-            "new_limit": str(new_limit),
+            "old_limit": current_limit,
+            "new_limit": new_limit,
             "mode": "recommend",
         }
     except Exception as e:
@@ -301,6 +381,73 @@ def tool_increase_memory_limit(
         return {"ok": False, "error": str(e)}
 
 
+# Pod event lists are capped and may be served from the apiserver watch cache
+# (resourceVersion="0") rather than a quorum read from etcd; slightly stale is fine here.
+_EVENT_LIST_LIMIT = 100
+
+# Fixed-substring event hints; "OOM-killed"/"OOM killed" are folded into "oomkilled" first.
+# Shared by get_pod_events (_scan_event) and check_oom through _mentions_oom.
+_OOM_SUBSTRS = ("oomkilled", "out of memory", "memory limit too low")
+_IMGPULL_SUBSTRS = ("imagepullbackoff", "errimagepull", "failed to pull image")
+# Container termination reasons that mean the kernel OOM killer fired.
+_OOM_TERMINATED_REASONS = frozenset(("OOMKilled",))
+# tool_check_oom lists at most this many Warning events for the pod in a single attempt (no
+# retries), within (connect, read) seconds: at most 2s to connect and 5s per socket read.
+_OOM_EVENT_LIMIT = 50
+_OOM_EVENT_TIMEOUT = (2, 5)
+# Container waiting reasons that mean the image could not be pulled.
+_IMGPULL_REASONS = frozenset(("ImagePullBackOff", "ErrImagePull"))
+
+
+_event_last_ts = attrgetter("last_timestamp")
+_event_time = attrgetter("event_time")
+_event_created = attrgetter("metadata.creation_timestamp")
+
+
+def _event_ts(e: Any) -> str:
+    # Use last_timestamp if present, else event_time, else metadata creation timestamp.
+    return str(_event_last_ts(e) or _event_time(e) or _event_created(e) or "")
+
+
+def _mentions_oom(text_l: str) -> bool:
+    """
+    True if lowercased event text carries an OOM hint:
+    - "OOMKilled" (kube reason)
+    - "OOM-killed" / "OOM killed" (runtime / kubelet messages)
+    - "out of memory"
+    - "memory limit too low" (heuristic hint)
+    """
+    norm = text_l.replace("oom-killed", "oomkilled").replace("oom killed", "oomkilled")
+    return any(s in norm for s in _OOM_SUBSTRS)
+
+
+def _mentions_imgpull(text_l: str) -> bool:
+    """True if lowercased event text carries an image pull failure hint."""
+    return any(s in text_l for s in _IMGPULL_SUBSTRS)
+
+
+def _scan_event(reason: str, message: str, buckets: Dict[str, List[str]]) -> None:
+    """
+    Classify one event into the "oom" / "imgpull" / "sandbox" buckets it matches.
+    The text is lowercased once and every matcher runs against that one copy.
+    """
+    msg_l = (reason + " " + message).lower()
+    hit = ""
+    if _mentions_oom(msg_l):
+        hit = f"{reason}: {message}".strip(": ").strip()
+        buckets["oom"].append(hit)
+
+    if _mentions_imgpull(msg_l):
+        hit = hit or f"{reason}: {message}".strip(": ").strip()
+        buckets["imgpull"].append(hit)
+
+    # Sandbox creation/start failures often show up while stuck in ContainerCreating.
+    # Example: FailedCreatePodSandBox ... "cannot start a stopped process"
+    if "failedcreatepodsandbox" in msg_l or "pod sandbox" in msg_l:
+        if "cannot start a stopped process" in msg_l or "cannot start a container that has stopped" in msg_l:
+            buckets["sandbox"].append(hit or f"{reason}: {message}".strip(": ").strip())
+
+
 def tool_get_pod_events(*, namespace: str, pod: str, limit: int = 25) -> Dict[str, Any]:
     """
     Tool: fetch recent events for a Pod.
@@ -311,31 +458,26 @@ def tool_get_pod_events(*, namespace: str, pod: str, limit: int = 25) -> Dict[st
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
+        core_v1, _, _ = _k8s()
 
         # Events are namespaced. Filter by involvedObject.name (and kind=Pod where supported).
         field_selector = f"involvedObject.name={pod}"
-        ev = core_v1.list_namespaced_event(namespace=namespace, field_selector=field_selector)
-        items = list(getattr(ev, "items", None) or [])
+        ev = core_v1.list_namespaced_event(
+            namespace=namespace,
+            field_selector=field_selector,
+            limit=_EVENT_LIST_LIMIT,
+            resource_version="0",
+        )
+        items = getattr(ev, "items", None) or ()
 
         # Keep newest-ish events first; many clusters don’t guarantee ordering.
-        def _ts(e: Any) -> str:
-            # Use last_timestamp if present, else event_time, else metadata creation timestamp.
-            for attr in ("last_timestamp", "event_time"):
-                v = getattr(e, attr, None)
-                if v:
-                    return str(v)
-            meta = getattr(e, "metadata", None)
-            return str(getattr(meta, "creation_timestamp", "") or "")
-
-        items.sort(key=_ts, reverse=True)
-        items = items[: max(1, int(limit or 25))]
+        # Only the newest `limit` events are needed: a bounded heap over pre-computed keys
+        # instead of sorting every event the namespace returned.
+        keyed = heapq.nlargest(max(1, int(limit or 25)), ((_event_ts(e), e) for e in items), key=lambda kv: kv[0])
 
         events: List[Dict[str, Any]] = []
-        oom_matches: List[str] = []
-        sandbox_matches: List[str] = []
-        for e in items:
+        buckets: Dict[str, List[str]] = {"oom": [], "imgpull": [], "sandbox": []}
+        for ts, e in keyed:
             reason = str(getattr(e, "reason", "") or "")
             message = str(getattr(e, "message", "") or "")
             etype = str(getattr(e, "type", "") or "")
@@ -345,29 +487,13 @@ def tool_get_pod_events(*, namespace: str, pod: str, limit: int = 25) -> Dict[st
                 "reason": reason,
                 "message": message,
                 "count": count,
-                "ts": _ts(e),
+                "ts": ts,
             }
             events.append(rec)
+            _scan_event(reason, message, buckets)
 
-            msg_l = (reason + " " + message).lower()
-            # Common variants:
-            # - "OOMKilled" (kube reason)
-            # - "OOM-killed" (runtime / kubelet messages)
-            # - "out of memory"
-            # - "memory limit too low" (heuristic hint)
-            if (
-                re.search(r"\boom[- ]?killed\b", msg_l)
-                or "oomkilled" in msg_l
-                or "out of memory" in msg_l
-                or "memory limit too low" in msg_l
-            ):
-                oom_matches.append(f"{reason}: {message}".strip(": ").strip())
-
-            # Sandbox creation/start failures often show up while stuck in ContainerCreating.
-            # Example: FailedCreatePodSandBox ... "cannot start a stopped process"
-            if "failedcreatepodsandbox" in msg_l or "pod sandbox" in msg_l:
-                if "cannot start a stopped process" in msg_l or "cannot start a container that has stopped" in msg_l:
-                    sandbox_matches.append(f"{reason}: {message}".strip(": ").strip())
+        oom_matches = buckets["oom"]
+        sandbox_matches = buckets["sandbox"]
 
         res = {
             "ok": True,
@@ -379,14 +505,15 @@ def tool_get_pod_events(*, namespace: str, pod: str, limit: int = 25) -> Dict[st
             "sandbox_failure_detected": len(sandbox_matches) > 0,
             "sandbox_failure_matches": sandbox_matches[:5],
         }
-        logger.info(
-            "tool=get_pod_events ok=true ns=%s pod=%s events=%d oom_detected=%s sandbox_failure_detected=%s",
-            namespace,
-            pod,
-            len(events),
-            res["oom_detected"],
-            res["sandbox_failure_detected"],
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "tool=get_pod_events ok=true ns=%s pod=%s events=%d oom_detected=%s sandbox_failure_detected=%s",
+                namespace,
+                pod,
+                len(events),
+                res["oom_detected"],
+                res["sandbox_failure_detected"],
+            )
         return res
     except Exception as e:
         logger.exception("tool=get_pod_events ok=false error=%s", e)
@@ -403,8 +530,7 @@ def tool_delete_pod(*, namespace: str, pod: str, mode: str = "recommend") -> Dic
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
+        core_v1, _, _ = _k8s()
         action_msg = f"delete_pod:{namespace}/{pod}"
 
         if mode == "auto":
@@ -419,6 +545,26 @@ def tool_delete_pod(*, namespace: str, pod: str, mode: str = "recommend") -> Dic
         return {"ok": False, "error": str(e)}
 
 
+# NotReady triage calls get_node_ready and get_node_conditions back to back; serve the
+# second read_node from a short-lived per-process cache instead of a second round trip.
+_NODE_CACHE_TTL_SECONDS = 2.0
+_NODE_CACHE: Dict[str, Tuple[float, Any]] = {}
+
+
+def _read_node_cached(node: str) -> Any:
+    n = tools_cache.get_node(node)
+    if n is not None:
+        return n
+    hit = _NODE_CACHE.get(node)
+    now = time.monotonic()
+    if hit is not None and now - hit[0] < _NODE_CACHE_TTL_SECONDS:
+        return hit[1]
+    core_v1, _, _ = _k8s()
+    n = core_v1.read_node(name=node)
+    _NODE_CACHE[node] = (now, n)
+    return n
+
+
 def tool_get_node_ready(*, node: str) -> Dict[str, Any]:
     """
     Tool: check whether a node is Ready.
@@ -429,28 +575,26 @@ def tool_get_node_ready(*, node: str) -> Dict[str, Any]:
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
-        n = core_v1.read_node(name=node)
+        n = _read_node_cached(node)
 
-        conds = list(getattr(getattr(n, "status", None), "conditions", None) or [])
+        conds = (n.status.conditions if n.status else None) or ()
         ready = False
         ready_rec: Dict[str, Any] = {}
         for c in conds:
-            if getattr(c, "type", None) == "Ready":
-                status = str(getattr(c, "status", "") or "")
+            if c.type == "Ready":
+                status = str(c.status or "")
                 ready = status == "True"
                 ready_rec = {
                     "type": "Ready",
                     "status": status,
-                    "reason": str(getattr(c, "reason", "") or ""),
-                    "message": str(getattr(c, "message", "") or ""),
-                    "last_transition_time": str(getattr(c, "last_transition_time", "") or ""),
+                    "reason": str(c.reason or ""),
+                    "message": str(c.message or ""),
+                    "last_transition_time": str(c.last_transition_time or ""),
                 }
                 break
 
         # Unschedulable flag is on spec.
-        unschedulable = bool(getattr(getattr(n, "spec", None), "unschedulable", False))
+        unschedulable = bool(n.spec.unschedulable) if n.spec else False
 
         res = {
             "ok": True,
@@ -477,22 +621,20 @@ def tool_get_node_conditions(*, node: str) -> Dict[str, Any]:
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
-        n = core_v1.read_node(name=node)
+        n = _read_node_cached(node)
 
-        conds = list(getattr(getattr(n, "status", None), "conditions", None) or [])
+        conds = (n.status.conditions if n.status else None) or ()
         by_type: Dict[str, Dict[str, Any]] = {}
         for c in conds:
-            ctype = str(getattr(c, "type", "") or "")
+            ctype = str(c.type or "")
             if not ctype:
                 continue
             by_type[ctype] = {
                 "type": ctype,
-                "status": str(getattr(c, "status", "") or ""),
-                "reason": str(getattr(c, "reason", "") or ""),
-                "message": str(getattr(c, "message", "") or ""),
-                "last_transition_time": str(getattr(c, "last_transition_time", "") or ""),
+                "status": str(c.status or ""),
+                "reason": str(c.reason or ""),
+                "message": str(c.message or ""),
+                "last_transition_time": str(c.last_transition_time or ""),
             }
 
         # Define what "healthy" means for non-Ready conditions.
@@ -530,13 +672,13 @@ def tool_uncordon_node(*, node: str, mode: str = "recommend") -> Dict[str, Any]:
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
+        core_v1, _, _ = _k8s()
         action_msg = f"uncordon_node:{node}"
 
         if mode == "auto":
             patch = {"spec": {"unschedulable": False}}
             core_v1.patch_node(name=node, body=patch)
+            _NODE_CACHE.pop(node, None)
             logger.info("tool=uncordon_node ok=true mode=auto node=%s", node)
             return {"ok": True, "action": action_msg, "mode": "auto"}
 
@@ -556,12 +698,12 @@ def tool_cordon_node(*, node: str, mode: str = "recommend") -> Dict[str, Any]:
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
+        core_v1, _, _ = _k8s()
         action_msg = f"cordon_node:{node}"
         if mode == "auto":
             patch = {"spec": {"unschedulable": True}}
             core_v1.patch_node(name=node, body=patch)
+            _NODE_CACHE.pop(node, None)
             logger.info("tool=cordon_node ok=true mode=auto node=%s", node)
             return {"ok": True, "action": action_msg, "mode": "auto"}
         logger.info("tool=cordon_node ok=true mode=recommend node=%s", node)
@@ -571,6 +713,9 @@ def tool_cordon_node(*, node: str, mode: str = "recommend") -> Dict[str, Any]:
         return {"ok": False, "error": str(e)}
 
 
+_EVICTION_WORKERS = 16
+
+
 def tool_drain_node(*, node: str, mode: str = "recommend", timeout_seconds: int = 300) -> Dict[str, Any]:
     """
     Tool: best-effort drain via Eviction API:
@@ -582,18 +727,24 @@ def tool_drain_node(*, node: str, mode: str = "recommend", timeout_seconds: int
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
-        policy_v1 = client.PolicyV1Api()
-
-        pods = core_v1.list_pod_for_all_namespaces(field_selector=f"spec.nodeName={node}").items or []
+        core_v1, _, policy_v1 = _k8s()
+
+        # kube-system pods are never evicted (control plane-ish components, best-effort),
+        # so let the apiserver drop them instead of shipping them over the wire.
+        selector = f"spec.nodeName={node},metadata.namespace!=kube-system"
+        pods = tools_cache.pods_on_node(node)
+        if pods is not None:
+            pods = [p for p in pods if p.metadata.namespace != "kube-system"]
+        else:
+            pods = core_v1.list_pod_for_all_namespaces(field_selector=selector).items or []
 
         evict_targets: List[tuple[str, str]] = []
         skipped: List[Dict[str, Any]] = []
         for p in pods:
-            ns = str(getattr(getattr(p, "metadata", None), "namespace", "") or "")
-            name = str(getattr(getattr(p, "metadata", None), "name", "") or "")
-            anns = getattr(getattr(p, "metadata", None), "annotations", None) or {}
+            meta = p.metadata
+            ns = meta.namespace or ""
+            name = meta.name or ""
+            anns = meta.annotations or {}
 
             # Mirror pods (static pods) have this annotation.
             if isinstance(anns, dict) and "kubernetes.io/config.mirror" in anns:
@@ -601,16 +752,11 @@ def tool_drain_node(*, node: str, mode: str = "recommend", timeout_seconds: int
                 continue
 
             # Skip DaemonSet-managed pods.
-            owners = getattr(getattr(p, "metadata", None), "owner_references", None) or []
-            if any(getattr(o, "kind", "") == "DaemonSet" for o in owners):
+            owners = meta.owner_references or ()
+            if next((o for o in owners if o.kind == "DaemonSet"), None) is not None:
                 skipped.append({"namespace": ns, "pod": name, "reason": "daemonset"})
                 continue
 
-            # Skip kube-system control plane-ish components to be safe (best-effort).
-            if ns == "kube-system":
-                skipped.append({"namespace": ns, "pod": name, "reason": "kube-system"})
-                continue
-
             evict_targets.append((ns, name))
 
         action_msg = f"drain_node:{node}:evict={len(evict_targets)}"
@@ -620,28 +766,52 @@ def tool_drain_node(*, node: str, mode: str = "recommend", timeout_seconds: int
 
         errors: List[str] = []
         start = time.time()
-        for ns, name in evict_targets:
+        pending: set[tuple[str, str]] = set()
+
+        def _evict(ns: str, name: str) -> None:
+            eviction = client.V1Eviction(
+                metadata=client.V1ObjectMeta(name=name, namespace=ns),
+                delete_options=client.V1DeleteOptions(grace_period_seconds=30),
+            )
+            policy_v1.create_namespaced_pod_eviction(name=name, namespace=ns, body=eviction)
+
+        # Evictions are independent POSTs (each with its own PDB check); issue them concurrently.
+        if evict_targets:
+            with ThreadPoolExecutor(max_workers=min(_EVICTION_WORKERS, len(evict_targets))) as ex:
+                futs = {(ns, name): ex.submit(_evict, ns, name) for ns, name in evict_targets}
+                for (ns, name), fut in futs.items():
+                    try:
+                        fut.result()
+                        pending.add((ns, name))
+                    except Exception as e:
+                        errors.append(f"{ns}/{name}:{e}")
+
+        # Wait for evicted pods to leave the node (best-effort): one list for the
+        # resourceVersion, then a single watch for DELETED events instead of re-listing.
+        if pending:
+            listing = core_v1.list_pod_for_all_namespaces(field_selector=selector)
+            pending &= {(p.metadata.namespace, p.metadata.name) for p in (listing.items or [])}
+        remaining_s = int(start + max(1, int(timeout_seconds)) - time.time())
+        if pending and remaining_s > 0:
+            w = watch.Watch()
             try:
-                eviction = client.V1Eviction(
-                    metadata=client.V1ObjectMeta(name=name, namespace=ns),
-                    delete_options=client.V1DeleteOptions(grace_period_seconds=30),
-                )
-                policy_v1.create_namespaced_pod_eviction(name=name, namespace=ns, body=eviction)
-            except Exception as e:
-                errors.append(f"{ns}/{name}:{e}")
-
-        # Wait for pods to leave the node (best-effort).
-        while time.time() - start < max(1, int(timeout_seconds)):
-            remaining = core_v1.list_pod_for_all_namespaces(field_selector=f"spec.nodeName={node}").items or []
-            remaining = [
-                p
-                for p in remaining
-                if str(getattr(getattr(p, "metadata", None), "namespace", "") or "") != "kube-system"
-                and not (isinstance(getattr(getattr(p, "metadata", None), "annotations", None) or {}, dict) and "kubernetes.io/config.mirror" in (getattr(getattr(p, "metadata", None), "annotations", None) or {}))
-            ]
-            if not remaining:
-                break
-            time.sleep(5)
+                for ev in w.stream(
+                    core_v1.list_pod_for_all_namespaces,
+                    field_selector=selector,
+                    resource_version=listing.metadata.resource_version,
+                    timeout_seconds=remaining_s,
+                ):
+                    if ev["type"] != "DELETED":
+                        continue
+                    meta = ev["object"].metadata
+                    pending.discard((meta.namespace, meta.name))
+                    if not pending:
+                        break
+            except client.exceptions.ApiException as e:
+                # e.g. 410 Gone if the resourceVersion expired; the wait is best-effort anyway.
+                logger.warning("tool=drain_node node=%s wait_interrupted status=%s", node, e.status)
+            finally:
+                w.stop()
 
         ok = len(errors) == 0
         logger.info("tool=drain_node ok=%s mode=auto node=%s errors=%d", ok, node, len(errors))
@@ -669,36 +839,38 @@ def tool_check_imagepullbackoff(*, namespace: str, pod: str, container: str = ""
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
-        p = core_v1.read_namespaced_pod(name=pod, namespace=namespace)
+        core_v1, _, _ = _k8s()
+        p = _read_pod(namespace, pod)
 
         detected = False
         detected_container = ""
         reasons: List[str] = []
 
-        statuses = list(getattr(getattr(p, "status", None), "container_statuses", None) or [])
+        statuses = (p.status.container_statuses if p.status else None) or ()
         for cs in statuses:
-            name = str(getattr(cs, "name", "") or "")
+            name = cs.name or ""
             if container and name != container:
                 continue
-            st = getattr(cs, "state", None)
-            waiting = getattr(st, "waiting", None) if st else None
-            w_reason = str(getattr(waiting, "reason", "") or "") if waiting else ""
-            if w_reason in {"ImagePullBackOff", "ErrImagePull"}:
+            waiting = cs.state.waiting if cs.state else None
+            w_reason = (waiting.reason or "") if waiting else ""
+            if w_reason in _IMGPULL_REASONS:
                 detected = True
                 detected_container = name or detected_container
                 reasons.append(f"pod_status_waiting_reason:{w_reason}")
 
         # Also inspect events for ImagePullBackOff-like messages.
         field_selector = f"involvedObject.name={pod}"
-        ev = core_v1.list_namespaced_event(namespace=namespace, field_selector=field_selector)
-        items = list(getattr(ev, "items", None) or [])
-        for e in items:
-            msg_l = (str(getattr(e, "reason", "") or "") + " " + str(getattr(e, "message", "") or "")).lower()
-            if "imagepullbackoff" in msg_l or "errimagepull" in msg_l or "failed to pull image" in msg_l:
-                detected = True
-                reasons.append("event_mentions_imagepull")
+        ev = core_v1.list_namespaced_event(
+            namespace=namespace,
+            field_selector=field_selector,
+            limit=_EVENT_LIST_LIMIT,
+            resource_version="0",
+        )
+        items = getattr(ev, "items", None) or ()
+        # Only the image pull hints matter here; stop at the first event that has one.
+        if any(_mentions_imgpull(f"{e.reason or ''} {e.message or ''}".lower()) for e in items):
+            detected = True
+            reasons.append("event_mentions_imagepull")
 
         res = {
             "ok": True,
@@ -706,7 +878,7 @@ def tool_check_imagepullbackoff(*, namespace: str, pod: str, container: str = ""
             "pod": pod,
             "imagepull_detected": detected,
             "container": detected_container or (container or ""),
-            "reasons": sorted(list(set(reasons))),
+            "reasons": sorted(set(reasons)),
         }
         logger.info(
             "tool=check_imagepullbackoff ok=true ns=%s pod=%s detected=%s container=%s",
@@ -721,6 +893,14 @@ def tool_check_imagepullbackoff(*, namespace: str, pod: str, container: str = ""
         return {"ok": False, "error": str(e)}
 
 
+def _is_timeout(e: Exception) -> bool:
+    # urllib3 wraps timeouts in MaxRetryError once its retries are exhausted.
+    if isinstance(e, urllib3.exceptions.MaxRetryError):
+        e = e.reason
+    # NewConnectionError (e.g. connection refused) subclasses ConnectTimeoutError; it is not one.
+    return isinstance(e, urllib3.exceptions.TimeoutError) and not isinstance(e, urllib3.exceptions.NewConnectionError)
+
+
 def tool_check_oom(*, namespace: str, pod: str, container: str = "") -> Dict[str, Any]:
     """
     Tool: detect OOM-related failures via pod container status and events.
@@ -731,43 +911,64 @@ def tool_check_oom(*, namespace: str, pod: str, container: str = "") -> Dict[str
         return {"ok": False, "error": "missing_required_params"}
 
     try:
-        config.load_incluster_config()
-        core_v1 = client.CoreV1Api()
-        p = core_v1.read_namespaced_pod(name=pod, namespace=namespace)
+        p = _read_pod(namespace, pod)
 
         detected = False
         detected_container = ""
         reasons: List[str] = []
 
-        statuses = list(getattr(getattr(p, "status", None), "container_statuses", None) or [])
+        statuses = (p.status.container_statuses if p.status else None) or ()
         for cs in statuses:
-            name = str(getattr(cs, "name", "") or "")
+            name = cs.name or ""
             if container and name != container:
                 continue
-            st = getattr(cs, "state", None)
-            last = getattr(cs, "last_state", None)
-
-            term = getattr(st, "terminated", None) if st else None
-            last_term = getattr(last, "terminated", None) if last else None
+            term = cs.state.terminated if cs.state else None
+            last_term = cs.last_state.terminated if cs.last_state else None
 
             for t in (term, last_term):
-                r = str(getattr(t, "reason", "") or "") if t else ""
-                if r == "OOMKilled":
+                r = (t.reason or "") if t else ""
+                if r in _OOM_TERMINATED_REASONS:
                     detected = True
                     detected_container = name or detected_container
-                    reasons.append("pod_status_terminated_reason:OOMKilled")
-
-        # Also inspect events for OOM-like messages (reuse patterns from get_pod_events).
-        field_selector = f"involvedObject.name={pod}"
-        ev = core_v1.list_namespaced_event(namespace=namespace, field_selector=field_selector)
-        items = list(getattr(ev, "items", None) or [])
-        for e in items:
-            msg_l = (str(getattr(e, "reason", "") or "") + " " + str(getattr(e, "message", "") or "")).lower()
-            if (
-                re.search(r"\boom[- ]?killed\b", msg_l)
-                or "out of memory" in msg_l
-                or "memory limit too low" in msg_l
-            ):
+                    reasons.append(f"pod_status_terminated_reason:{r}")
+
+        # Pod status is authoritative; only fall back to events (one more API round trip)
+        # when it shows no OOM kill.
+        if not detected:
+            # Also inspect events for OOM-like messages (same _mentions_oom as get_pod_events).
+            # OOM hints only ever come as Warning events, so let the apiserver drop the
+            # Normal lifecycle noise (Scheduled/Pulled/Created/Started) and bound the list.
+            items = tools_cache.warning_events_for(namespace, pod)
+            if items is not None:
+                fields = [f for e in items for f in (e.reason, e.message) if f]
+            else:
+                field_selector = f"involvedObject.name={pod},type=Warning"
+                # Only reason/message are read: take the raw JSON instead of having the client
+                # build a CoreV1Event model (timestamps, object refs, ...) for every item.
+                # Events are supporting evidence only: a slow apiserver must not pin the tool,
+                # so bound the call and report the timeout instead of failing the check.
+                raw_items: Any = ()
+                try:
+                    resp = _k8s_single_attempt().list_namespaced_event(
+                        namespace=namespace,
+                        field_selector=field_selector,
+                        limit=_OOM_EVENT_LIMIT,
+                        _preload_content=False,
+                        _request_timeout=_OOM_EVENT_TIMEOUT,
+                    )
+                    try:
+                        raw_items = orjson.loads(resp.data).get("items") or ()
+                    finally:
+                        resp.release_conn()
+                except urllib3.exceptions.HTTPError as e:
+                    if not _is_timeout(e):
+                        raise
+                    reasons.append("event_list_timeout")
+                fields = [f for item in raw_items for f in (item.get("reason"), item.get("message")) if f]
+            # One lowercase + substring pass over all reasons/messages (newline-separated, so
+            # no hint can span two fields) instead of a Python-level loop with a check per field.
+            text = "\n".join(fields)
+            if text and _mentions_oom(text.lower()):
                 detected = True
                 reasons.append("event_mentions_oom")
 
@@ -777,10 +978,15 @@ def tool_check_oom(*, namespace: str, pod: str, container: str = "") -> Dict[str
             "pod": pod,
             "oom_detected": detected,
             "container": detected_container or (container or ""),
-            "reasons": sorted(list(set(reasons))),
+            "reasons": list(dict.fromkeys(reasons)),
         }
-        logger.info("tool=check_oom ok=true ns=%s pod=%s detected=%s container=%s", namespace, pod, detected, res.get("container", ""))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("tool=check_oom ok=true ns=%s pod=%s detected=%s container=%s", namespace, pod, detected, res["container"])
         return res
+    except client.exceptions.ApiException as e:
+        # Expected API failures (e.g. 404 for a pod that is already gone): no traceback.
+        logger.warning("tool=check_oom ok=false ns=%s pod=%s status=%s", namespace, pod, e.status)
+        return {"ok": False, "error": f"api:{e.status}"}
     except Exception as e:
         logger.exception("tool=check_oom ok=false error=%s", e)
         return {"ok": False, "error": str(e)}
@@ -0,0 +1,225 @@
+"""Watch-backed in-memory stores for the Kubernetes objects the tools read most.
+
+Enabled with K8S_WATCH_CACHE=1. Each store lists its resource once, then follows a
+watch from the returned resourceVersion on a daemon thread, so tool reads become dict
+lookups instead of apiserver round trips. Lookups return None while a store is not
+synced (first list still running, or re-listing after a watch failure); callers then
+fall back to a direct API read.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from kubernetes import client, watch
+
+logger = logging.getLogger("agentic_sre.tools_cache")
+
+ENABLED = os.getenv("K8S_WATCH_CACHE", "0").lower() in ("1", "true", "yes")
+
+# Server-side timeout of each watch request; the store resumes from its last
+# resourceVersion afterwards, so this only bounds how long a dead connection can linger.
+_WATCH_TIMEOUT_SECONDS = 300
+_RETRY_SECONDS = 5.0
+
+
+def _ns_name_key(obj: Any) -> Hashable:
+    return (obj.metadata.namespace, obj.metadata.name)
+
+
+def _name_key(obj: Any) -> Hashable:
+    return obj.metadata.name
+
+
+def _involved_object_key(ev: Any) -> Hashable:
+    return (ev.metadata.namespace, ev.involved_object.name)
+
+
+class WatchStore:
+    """
+    A dict of objects kept current by one list + watch loop on a background thread.
+
+    `index_fn`, if given, maintains a secondary index (e.g. events by the object they
+    are about) so `by_index` does not have to scan every item.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        list_fn: Callable[..., Any],
+        key_fn: Callable[[Any], Hashable],
+        index_fn: Optional[Callable[[Any], Hashable]] = None,
+        **list_kwargs: Any,
+    ):
+        self.name = name
+        self._list_fn = list_fn
+        self._key_fn = key_fn
+        self._index_fn = index_fn
+        self._list_kwargs = list_kwargs
+        self._items: Dict[Hashable, Any] = {}
+        self._index: Dict[Hashable, Dict[Hashable, Any]] = {}
+        self._synced = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"watch-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self._synced:
+            return None
+        return self._items.get(key)
+
+    def values(self) -> Optional[List[Any]]:
+        if not self._synced:
+            return None
+        with self._lock:
+            return list(self._items.values())
+
+    def by_index(self, ikey: Hashable) -> Optional[List[Any]]:
+        if not self._synced:
+            return None
+        with self._lock:
+            return list(self._index.get(ikey, {}).values())
+
+    def _put(self, key: Hashable, obj: Any) -> None:
+        if self._index_fn is not None:
+            self._unindex(key)
+            self._index.setdefault(self._index_fn(obj), {})[key] = obj
+        self._items[key] = obj
+
+    def _remove(self, key: Hashable) -> None:
+        if self._index_fn is not None:
+            self._unindex(key)
+        self._items.pop(key, None)
+
+    def _unindex(self, key: Hashable) -> None:
+        old = self._items.get(key)
+        if old is None:
+            return
+        ikey = self._index_fn(old)
+        bucket = self._index.get(ikey)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._index[ikey]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._list_and_watch()
+                continue
+            except Exception as e:
+                logger.warning("watch_cache store=%s resync error=%s", self.name, e)
+            self._synced = False
+            self._stop.wait(_RETRY_SECONDS)
+
+    def _list_and_watch(self) -> None:
+        resp = self._list_fn(**self._list_kwargs)
+        with self._lock:
+            self._items = {}
+            self._index = {}
+            for o in resp.items or ():
+                self._put(self._key_fn(o), o)
+        self._synced = True
+        rv = resp.metadata.resource_version
+        logger.info("watch_cache store=%s synced=true items=%d", self.name, len(self._items))
+
+        while not self._stop.is_set():
+            w = watch.Watch()
+            try:
+                for ev in w.stream(
+                    self._list_fn,
+                    resource_version=rv,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=_WATCH_TIMEOUT_SECONDS,
+                    **self._list_kwargs,
+                ):
+                    etype = ev["type"]
+                    if etype == "BOOKMARK":
+                        # The client does not deserialize bookmarks (ev["object"] stays a
+                        # dict); they only advance the resourceVersion to resume from.
+                        rv = ev["raw_object"]["metadata"]["resourceVersion"]
+                        continue
+                    obj = ev["object"]
+                    rv = obj.metadata.resource_version
+                    key = self._key_fn(obj)
+                    with self._lock:
+                        if etype == "DELETED":
+                            self._remove(key)
+                        else:
+                            self._put(key, obj)
+                    if self._stop.is_set():
+                        break
+            except client.exceptions.ApiException as e:
+                if e.status == 410:
+                    # resourceVersion too old: start over with a fresh list. Lookups fall
+                    # back to the API until it lands rather than reading the stale map.
+                    self._synced = False
+                    logger.info("watch_cache store=%s relist=true reason=gone", self.name)
+                    return
+                raise
+            finally:
+                w.stop()
+
+
+_stores_lock = threading.Lock()
+_pods: Optional[WatchStore] = None
+_nodes: Optional[WatchStore] = None
+_deployments: Optional[WatchStore] = None
+_warning_events: Optional[WatchStore] = None
+
+
+def start(core_v1: client.CoreV1Api, apps_v1: client.AppsV1Api) -> None:
+    """Start the pod, node, deployment and Warning event stores once per process (no-op unless ENABLED)."""
+    global _pods, _nodes, _deployments, _warning_events
+    if not ENABLED:
+        return
+    with _stores_lock:
+        if _pods is not None:
+            return
+        _pods = WatchStore("pods", core_v1.list_pod_for_all_namespaces, _ns_name_key)
+        _nodes = WatchStore("nodes", core_v1.list_node, _name_key)
+        _deployments = WatchStore("deployments", apps_v1.list_deployment_for_all_namespaces, _ns_name_key)
+        # Only Warning events: they carry the failure hints and are a small share of all events.
+        _warning_events = WatchStore(
+            "warning-events",
+            core_v1.list_event_for_all_namespaces,
+            _ns_name_key,
+            index_fn=_involved_object_key,
+            field_selector="type=Warning",
+        )
+        for s in (_pods, _nodes, _deployments, _warning_events):
+            s.start()
+
+
+def get_pod(namespace: str, name: str) -> Optional[client.V1Pod]:
+    return _pods.get((namespace, name)) if _pods is not None else None
+
+
+def get_node(name: str) -> Optional[client.V1Node]:
+    return _nodes.get(name) if _nodes is not None else None
+
+
+def get_deployment(namespace: str, name: str) -> Optional[client.V1Deployment]:
+    return _deployments.get((namespace, name)) if _deployments is not None else None
+
+
+def pods_on_node(node: str) -> Optional[List[client.V1Pod]]:
+    """Pods currently scheduled on `node`, or None if the pod store is not synced."""
+    pods = _pods.values() if _pods is not None else None
+    if pods is None:
+        return None
+    return [p for p in pods if p.spec is not None and p.spec.node_name == node]
+
+
+def warning_events_for(namespace: str, name: str) -> Optional[List[client.CoreV1Event]]:
+    """Warning events about object `name` in `namespace`, or None if the store is not synced."""
+    return _warning_events.by_index((namespace, name)) if _warning_events is not None else None
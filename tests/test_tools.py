@@ -0,0 +1,54 @@
+from kubernetes import client
+
+from agent import tools, tools_cache
+
+
+def _event(name: str, rv: str, reason: str, message: str) -> client.CoreV1Event:
+    return client.CoreV1Event(
+        metadata=client.V1ObjectMeta(namespace="default", name=name, resource_version=rv),
+        involved_object=client.V1ObjectReference(namespace="default", name="web-0"),
+        reason=reason,
+        message=message,
+    )
+
+
+def test_check_oom_reads_warning_events_store_across_bookmark(monkeypatch):
+    listed = client.CoreV1EventList(
+        items=[_event("web-0.1", "1", "BackOff", "Back-off restarting failed container")],
+        metadata=client.V1ListMeta(resource_version="1"),
+    )
+    store = tools_cache.WatchStore(
+        "warning-events",
+        lambda **_: listed,
+        tools_cache._ns_name_key,
+        index_fn=tools_cache._involved_object_key,
+        field_selector="type=Warning",
+    )
+    bookmark = {"metadata": {"resourceVersion": "4"}}
+    stream = [
+        {"type": "BOOKMARK", "object": bookmark, "raw_object": bookmark},
+        {"type": "ADDED", "object": _event("web-0.2", "5", "Failed", "container was OOM-killed")},
+    ]
+
+    class FakeWatch:
+        def stream(self, _fn, **_kwargs):
+            yield from stream
+            store.stop()
+
+        def stop(self):
+            pass
+
+    def no_api(*_args, **_kwargs):
+        raise AssertionError("event list must be served from the watch store")
+
+    monkeypatch.setattr(tools_cache.watch, "Watch", FakeWatch)
+    monkeypatch.setattr(tools_cache, "_warning_events", store)
+    monkeypatch.setattr(tools, "_read_pod", lambda namespace, pod: client.V1Pod(status=client.V1PodStatus()))
+    monkeypatch.setattr(tools, "_k8s_single_attempt", no_api)
+
+    store._list_and_watch()
+    res = tools.tool_check_oom(namespace="default", pod="web-0")
+
+    assert store._synced
+    assert res["ok"] and res["oom_detected"]
+    assert res["reasons"] == ["event_mentions_oom"]
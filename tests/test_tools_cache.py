@@ -0,0 +1,66 @@
+from kubernetes import client
+
+from agent import tools_cache
+
+
+def _pod(name: str, rv: str) -> client.V1Pod:
+    return client.V1Pod(metadata=client.V1ObjectMeta(namespace="default", name=name, resource_version=rv))
+
+
+def _bookmark(rv: str) -> dict:
+    # What kubernetes 37.x yields for a bookmark: type plus the undeserialized object.
+    obj = {"kind": "Pod", "apiVersion": "v1", "metadata": {"resourceVersion": rv}}
+    return {"type": "BOOKMARK", "object": obj, "raw_object": obj}
+
+
+def _fake_watch(store, batches):
+    """Watch stand-in: each stream() call yields the next batch (an exception is raised)."""
+    calls = []
+
+    class FakeWatch:
+        def stream(self, _fn, **kwargs):
+            calls.append(kwargs["resource_version"])
+            batch = batches.pop(0)
+            if isinstance(batch, Exception):
+                raise batch
+            yield from batch
+            if not batches:
+                store.stop()
+
+        def stop(self):
+            pass
+
+    return FakeWatch, calls
+
+
+def _store(monkeypatch, batches):
+    listed = client.V1PodList(items=[_pod("a", "1")], metadata=client.V1ListMeta(resource_version="1"))
+    store = tools_cache.WatchStore("pods", lambda **_: listed, tools_cache._ns_name_key)
+    fake, calls = _fake_watch(store, batches)
+    monkeypatch.setattr(tools_cache.watch, "Watch", fake)
+    return store, calls
+
+
+def test_bookmark_advances_resource_version_and_stays_synced(monkeypatch):
+    store, calls = _store(
+        monkeypatch,
+        [
+            [_bookmark("5"), {"type": "ADDED", "object": _pod("b", "6")}],
+            [_bookmark("9")],
+        ],
+    )
+
+    store._list_and_watch()
+
+    assert calls == ["1", "6"]
+    assert store._synced
+    assert store.get(("default", "b")) is not None
+
+
+def test_gone_marks_store_unsynced_until_relist(monkeypatch):
+    store, _ = _store(monkeypatch, [client.exceptions.ApiException(status=410)])
+
+    store._list_and_watch()
+
+    assert not store._synced
+    assert store.get(("default", "a")) is None